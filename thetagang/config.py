@@ -108,6 +108,7 @@ class OrdersConfig(BaseModel, DisplayMixin):
 class IBAsyncConfig(BaseModel):
     api_response_wait_time: int = Field(default=60, ge=0)
     logfile: Optional[str] = None
+    max_concurrency: int = Field(default=4, ge=1)
 
 
 class IBCConfig(BaseModel):
@@ -525,7 +526,7 @@ class Config(BaseModel, DisplayMixin):
     @model_validator(mode="after")
     def check_symbol_weights(self) -> Self:
         if not math.isclose(
-            1, sum([s.weight or 0.0 for s in self.symbols.values()]), rel_tol=1e-5
+            1, sum(s.weight or 0.0 for s in self.symbols.values()), rel_tol=1e-5
         ):
             raise ValueError("Symbol weights must sum to 1.0")
         return self
@@ -625,17 +626,15 @@ class Config(BaseModel, DisplayMixin):
         table.add_column("Put strike limit", justify="right")
         table.add_column("Put threshold", justify="right")
 
+        def write_threshold(symbol: str, right: str) -> str:
+            threshold_sigma = self.get_write_threshold_sigma(symbol, right)
+            if threshold_sigma:
+                return f"{ffmt(threshold_sigma)}σ"
+            return pfmt(self.get_write_threshold_perc(symbol, right))
+
         for symbol, sconfig in self.symbols.items():
-            call_thresh = (
-                f"{ffmt(self.get_write_threshold_sigma(symbol, 'C'))}σ"
-                if self.get_write_threshold_sigma(symbol, "C")
-                else pfmt(self.get_write_threshold_perc(symbol, "C"))
-            )
-            put_thresh = (
-                f"{ffmt(self.get_write_threshold_sigma(symbol, 'P'))}σ"
-                if self.get_write_threshold_sigma(symbol, "P")
-                else pfmt(self.get_write_threshold_perc(symbol, "P"))
-            )
+            call_thresh = write_threshold(symbol, "C")
+            put_thresh = write_threshold(symbol, "P")
 
             table.add_row(
                 symbol,
@@ -805,7 +804,7 @@ def normalize_config(config: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, A
 
     if "parts" in list(config["symbols"].values())[0]:
         # If using "parts" instead of "weight", convert parts into weights
-        total_parts = float(sum([s["parts"] for s in config["symbols"].values()]))
+        total_parts = float(sum(s["parts"] for s in config["symbols"].values()))
         for k in config["symbols"].keys():
             config["symbols"][k]["weight"] = config["symbols"][k]["parts"] / total_parts
         for s in config["symbols"].values():
@@ -21,6 +21,9 @@ from thetagang import log
 
 console = Console()
 
+# Order statuses that mean an order hasn't reached the exchange yet
+PENDING_SUBMIT_STATUSES = frozenset({"PendingSubmit", "PreSubmitted"})
+
 
 class TickerField(Enum):
     MIDPOINT = "midpoint"
@@ -218,9 +221,9 @@ class IBKR:
         """
         Handles the streaming of market data for a given contract.
 
-        This asynchronous method qualifies the contract, requests market data,
-        and processes the data using the provided handler. Once the handler
-        completes, the market data request is canceled.
+        This asynchronous method qualifies the contract (unless it was already
+        qualified), requests market data, and processes the data using the
+        provided handler.
 
         Args:
             contract (Contract): The contract for which market data is requested.
@@ -230,7 +233,10 @@ class IBKR:
         Returns:
             Ticker: The market data ticker for the given contract.
         """
-        await self.ib.qualifyContractsAsync(contract)
+        # Contracts that already have a conId were qualified by the caller (e.g.,
+        # option chain contracts), so skip the extra round trip to TWS
+        if not contract.conId:
+            await self.ib.qualifyContractsAsync(contract)
         ticker = self.ib.reqMktData(contract, genericTickList=generic_tick_list)
         await handler(ticker)
         return ticker
@@ -259,8 +265,7 @@ class IBKR:
         tasks = [
             self.__trade_wait_for_condition__(
                 trade,
-                lambda trade: trade.orderStatus.status
-                not in ["PendingSubmit", "PreSubmitted"],
+                lambda trade: trade.orderStatus.status not in PENDING_SUBMIT_STATUSES,
                 timetout,
             )
             for trade in trades
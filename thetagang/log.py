@@ -1,8 +1,9 @@
 import asyncio
-from typing import Any, Coroutine, Iterable, Iterator, List, Union
+from contextlib import contextmanager
+from typing import Any, Coroutine, Iterable, Iterator, List, Optional, Union
 
 from annotated_types import T
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.progress import (
     BarColumn,
@@ -42,22 +43,58 @@ def error(text: str) -> None:
     console.print(text, style="red")
 
 
-def print(content: Union[Panel, Table]) -> None:
+def print(content: Union[Group, Panel, Table]) -> None:
     console.print(content)
 
 
-async def track_async(tasks: List[Coroutine[Any, Any, T]], description: str) -> List[T]:
+# Rich only allows one live display at a time, so concurrent (or nested)
+# trackers share a single Progress. It's started by the first tracker and
+# stopped once the last active tracker finishes.
+shared_progress: Optional[Progress] = None
+shared_progress_users = 0
+
+
+@contextmanager
+def progress_display() -> Iterator[Progress]:
+    global shared_progress, shared_progress_users
+
+    if shared_progress is None:
+        shared_progress = Progress(
+            TextColumn("{task.description: <80}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TaskProgressColumn(),
+        )
+        shared_progress.start()
+    progress = shared_progress
+    shared_progress_users += 1
+    try:
+        yield progress
+    finally:
+        shared_progress_users -= 1
+        if shared_progress_users == 0:
+            progress.stop()
+            shared_progress = None
+
+
+async def track_async(
+    tasks: List[Coroutine[Any, Any, T]],
+    description: str,
+    max_concurrency: Optional[int] = None,
+) -> List[T]:
     results = []
     total_tasks = len(tasks)
 
-    progress = Progress(
-        TextColumn("{task.description: <80}"),
-        BarColumn(),
-        MofNCompleteColumn(),
-        TaskProgressColumn(),
-    )
+    if max_concurrency:
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-    with progress:
+        async def limited(coro: Coroutine[Any, Any, T]) -> T:
+            async with semaphore:
+                return await coro
+
+        tasks = [limited(coro) for coro in tasks]
+
+    with progress_display() as progress:
         progress_task = progress.add_task(description, total=total_tasks)
         for coro in asyncio.as_completed(tasks):
             result = await coro
@@ -68,14 +105,7 @@ async def track_async(tasks: List[Coroutine[Any, Any, T]], description: str) ->
 
 
 def track(sequence: Iterable[T], description: str, total: int) -> Iterator[T]:
-    progress = Progress(
-        TextColumn("{task.description: <80}"),
-        BarColumn(),
-        MofNCompleteColumn(),
-        TaskProgressColumn(),
-    )
-
-    with progress:
+    with progress_display() as progress:
         task_id = progress.add_task(description, total=total)
         for item in sequence:
             yield item
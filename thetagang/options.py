@@ -1,6 +1,11 @@
 from datetime import date, datetime
+from functools import lru_cache
 
 
+# Expiration strings are parsed repeatedly for the same contracts (sorting,
+# roll checks, display), so memoize the parse. The DTE itself depends on
+# today's date and is not cached.
+@lru_cache(maxsize=4096)
 def contract_date_to_datetime(expiration: str) -> datetime:
     if len(expiration) == 8:
         return datetime.strptime(expiration, "%Y%m%d")
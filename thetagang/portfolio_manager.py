@@ -1,9 +1,11 @@
+import asyncio
 import logging
 import math
 import random
 import sys
 from asyncio import Future
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import partial
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
 
 import numpy as np
 from ib_async import (
@@ -11,6 +13,7 @@ from ib_async import (
     PortfolioItem,
     TagValue,
     Ticker,
+    Trade,
     util,
 )
 from ib_async.contract import ComboLeg, Contract, Index, Option, Stock
@@ -27,10 +30,10 @@ from thetagang.ibkr import IBKR, RequiredFieldValidationError, TickerField
 from thetagang.orders import Orders
 from thetagang.trades import Trades
 from thetagang.util import (
+    PositionAggregates,
     account_summary_to_dict,
+    aggregate_positions,
     calculate_net_short_positions,
-    count_long_option_positions,
-    count_short_option_positions,
     get_higher_price,
     get_lower_price,
     get_short_positions,
@@ -39,8 +42,6 @@ from thetagang.util import (
     net_option_positions,
     portfolio_positions_to_dict,
     position_pnl,
-    weighted_avg_long_strike,
-    weighted_avg_short_strike,
     would_increase_spread,
 )
 
@@ -67,6 +68,14 @@ class PortfolioManager:
     ) -> None:
         self.account_number = config.account.number
         self.config = config
+        self.roll_when = config.roll_when
+        self.target = config.target
+        # The symbol config doesn't change at runtime, so resolve these once
+        self.symbols: List[str] = list(config.symbols.keys())
+        self.primary_exchanges: Dict[str, str] = {
+            symbol: symbol_config.primary_exchange
+            for symbol, symbol_config in config.symbols.items()
+        }
         self.ibkr = IBKR(
             ib,
             config.ib_async.api_response_wait_time,
@@ -79,6 +88,14 @@ class PortfolioManager:
         self.trades: Trades = Trades(self.ibkr)
         self.target_quantities: Dict[str, int] = {}
         self.qualified_contracts: Dict[int, Contract] = {}
+        self.stock_tickers: Dict[Tuple[str, str], Ticker] = {}
+        self.stock_ticker_requests: Dict[Tuple[str, str], asyncio.Future[Ticker]] = {}
+        self.daily_stddevs: Dict[str, float] = {}
+        # The VIX indexes are the same contracts every time, so build them once.
+        # Once qualified they keep their conId, which lets later requests skip
+        # qualifying.
+        self.vix_index = Index("VIX", "CBOE", "USD")
+        self.vixmo_index = Index("VIXMO", "CBOE", "USD")
         self.dry_run = dry_run
 
     def get_short_calls(
@@ -94,22 +111,148 @@ class PortfolioManager:
     def get_short_contracts(
         self, portfolio_positions: Dict[str, List[PortfolioItem]], right: str
     ) -> List[PortfolioItem]:
-        ret: List[PortfolioItem] = []
-        for symbol in portfolio_positions:
-            ret = ret + get_short_positions(portfolio_positions[symbol], right)
-        return ret
+        return [
+            position
+            for positions in portfolio_positions.values()
+            for position in get_short_positions(positions, right)
+        ]
 
-    async def put_is_itm(self, contract: Contract) -> bool:
-        ticker = await self.ibkr.get_ticker_for_stock(
-            contract.symbol, contract.primaryExchange
+    def request_stock_ticker(
+        self,
+        key: Tuple[str, str],
+        request: Callable[[], Coroutine[Any, Any, Ticker]],
+    ) -> asyncio.Future[Ticker]:
+        # Concurrent tasks asking for the same stock share one in-flight
+        # request, rather than each sending their own
+        future = self.stock_ticker_requests.get(key)
+        if future is None:
+            future = asyncio.ensure_future(request())
+            self.stock_ticker_requests[key] = future
+            future.add_done_callback(partial(self.stock_ticker_request_done, key))
+        return future
+
+    def stock_ticker_request_done(
+        self, key: Tuple[str, str], future: asyncio.Future[Ticker]
+    ) -> None:
+        # Ignore requests left over from a previous run, which has since
+        # cleared the cache
+        if self.stock_ticker_requests.get(key) is not future:
+            return
+        del self.stock_ticker_requests[key]
+        if not future.cancelled() and future.exception() is None:
+            self.stock_tickers[key] = future.result()
+
+    async def get_ticker_for_stock(self, symbol: str, primary_exchange: str) -> Ticker:
+        # Market data subscriptions keep streaming into the same Ticker, so
+        # once we have a valid ticker for a stock we can reuse it for the
+        # rest of the run instead of requesting it again. manage() clears the
+        # cache at the start of each run.
+        key = (symbol, primary_exchange)
+        ticker = self.stock_tickers.get(key)
+        if ticker is not None:
+            return ticker
+
+        # The shield keeps one waiter being cancelled from cancelling the
+        # request for everyone else waiting on it
+        return await asyncio.shield(
+            self.request_stock_ticker(
+                key, lambda: self.ibkr.get_ticker_for_stock(symbol, primary_exchange)
+            )
+        )
+
+    def get_stock_contract(self, symbol: str, primary_exchange: str) -> Stock:
+        # Reuse the contract from the cached ticker when we have one, since
+        # it's already been qualified and doesn't need another round trip
+        ticker = self.stock_tickers.get((symbol, primary_exchange))
+        if ticker is not None and isinstance(ticker.contract, Stock):
+            return ticker.contract
+        return Stock(
+            symbol,
+            self.get_order_exchange(),
+            currency="USD",
+            primaryExchange=primary_exchange,
         )
+
+    async def prefetch_stock_tickers(
+        self,
+        stocks: List[Tuple[str, str]],
+        description: str = "Fetching stock tickers...",
+    ) -> None:
+        # Request all of the (symbol, primary exchange) tickers up front in one
+        # concurrent batch, so the per-symbol tasks that follow only need to hit
+        # the cache. Stocks another task is already fetching are left to that
+        # request.
+        keys = [
+            key
+            for key in dict.fromkeys(stocks)
+            if key not in self.stock_tickers and key not in self.stock_ticker_requests
+        ]
+        if not keys:
+            return
+
+        contracts = [
+            Stock(
+                symbol,
+                self.get_order_exchange(),
+                currency="USD",
+                primaryExchange=primary_exchange,
+            )
+            for symbol, primary_exchange in keys
+        ]
+        # Qualify every contract in a single request, rather than one request
+        # per ticker. Anything left unqualified gets qualified on its own when
+        # its ticker is requested.
+        qualified = asyncio.ensure_future(self.ibkr.qualify_contracts(*contracts))
+
+        async def fetch_ticker(contract: Stock) -> Ticker:
+            await qualified
+            return await self.ibkr.get_ticker_for_contract(contract)
+
+        # Register every request before awaiting anything, so lookups for the
+        # same stocks made in the meantime join them instead of sending their
+        # own
+        requests = [
+            self.request_stock_ticker(key, partial(fetch_ticker, contract))
+            for key, contract in zip(keys, contracts)
+        ]
+
+        async def fetch_ticker_task(
+            key: Tuple[str, str], request: asyncio.Future[Ticker]
+        ) -> None:
+            # A failed request isn't cached, so whoever needs the ticker next
+            # asks for it again and handles the error the way it always has
+            try:
+                await asyncio.shield(request)
+            except (RuntimeError, RequiredFieldValidationError):
+                log.error(
+                    f"{key[0]}: Fetching stock ticker failed. Continuing anyway..."
+                )
+
+        tasks = [
+            fetch_ticker_task(key, request) for key, request in zip(keys, requests)
+        ]
+        await log.track_async(tasks, description=description)
+
+    async def option_is_itm(self, contract: Contract, right: str) -> bool:
+        # Special case for handling VIX
+        if contract.symbol == "VIX":
+            ticker = await self.ibkr.get_ticker_for_contract(self.vix_index)
+        else:
+            ticker = await self.get_ticker_for_stock(
+                contract.symbol, contract.primaryExchange
+            )
+        if right.startswith("C"):
+            return contract.strike <= ticker.marketPrice()
         return contract.strike >= ticker.marketPrice()
 
+    async def put_is_itm(self, contract: Contract) -> bool:
+        return await self.option_is_itm(contract, "P")
+
     def position_can_be_closed(self, position: PortfolioItem, table: Table) -> bool:
         if not self.config.trading_is_allowed(position.contract.symbol):
             return False
 
-        close_at_pnl = self.config.roll_when.close_at_pnl
+        close_at_pnl = self.roll_when.close_at_pnl
         if close_at_pnl:
             pnl = position_pnl(position)
 
@@ -127,209 +270,138 @@ class PortfolioManager:
         return self.position_can_be_closed(put, table)
 
     async def put_can_be_rolled(self, put: PortfolioItem, table: Table) -> bool:
-        # Ignore long positions, we only roll shorts
-        if put.position > 0:
-            return False
+        return await self.position_can_be_rolled(put, "P", table)
 
-        if not self.config.trading_is_allowed(put.contract.symbol):
-            return False
+    async def call_is_itm(self, contract: Contract) -> bool:
+        return await self.option_is_itm(contract, "C")
 
-        try:
-            itm = await self.put_is_itm(put.contract)
-        except RequiredFieldValidationError:
-            log.error(
-                f"Checking rollable puts failed for #{put.contract.symbol}. Continuing anyway..."
-            )
-            return False
+    def call_can_be_closed(self, call: PortfolioItem, table: Table) -> bool:
+        return self.position_can_be_closed(call, table)
 
-        if (
-            isinstance(put.contract, Option)
-            and itm
-            and self.config.roll_when.puts.always_when_itm
-        ):
-            table.add_row(
-                f"{put.contract.localSymbol}",
-                "[blue]Roll",
-                f"[blue]Will be rolled because put is ITM "
-                f"and always_when_itm={self.config.roll_when.puts.always_when_itm}",
-            )
-            return True
+    async def call_can_be_rolled(self, call: PortfolioItem, table: Table) -> bool:
+        return await self.position_can_be_rolled(call, "C", table)
 
-        # Check if this put is ITM, and if it's o.k. to roll
-        if (
-            not self.config.roll_when.puts.itm
-            and isinstance(put.contract, Option)
-            and itm
-        ):
-            return False
+    def roll_needs_itm_check(self, kind: str) -> bool:
+        # The ITM check needs market data for the underlying, so only do it when
+        # the result can actually change the decision
+        roll_when_kind = getattr(self.roll_when, kind)
+        return roll_when_kind.always_when_itm or not roll_when_kind.itm
 
-        # Don't roll if there are excess puts and we're configured not to roll
-        if (
-            put.contract.symbol in self.has_excess_puts
-            and not self.config.roll_when.puts.has_excess
-        ):
-            table.add_row(
-                f"{put.contract.localSymbol}",
-                "[cyan1]None",
-                "[cyan1]Won't be rolled because there are excess puts",
-            )
+    async def position_can_be_rolled(
+        self, position: PortfolioItem, right: str, table: Table
+    ) -> bool:
+        # Ignore long positions, we only roll shorts
+        if position.position > 0:
             return False
 
-        dte = option_dte(put.contract.lastTradeDateOrContractMonth)
-        pnl = position_pnl(put)
-
-        roll_when_dte = self.config.roll_when.dte
-        roll_when_pnl = self.config.roll_when.pnl
-        roll_when_min_pnl = self.config.roll_when.min_pnl
-
-        if self.config.roll_when.max_dte and dte > self.config.roll_when.max_dte:
+        symbol = position.contract.symbol
+        if not self.config.trading_is_allowed(symbol):
             return False
 
-        if dte <= roll_when_dte:
-            if pnl >= roll_when_min_pnl:
-                table.add_row(
-                    f"{put.contract.localSymbol}",
-                    "[blue]Roll",
-                    f"[blue]Can be rolled because DTE of {dte} is <= {self.config.roll_when.dte} and P&L of {pfmt(pnl, 1)} is >= {pfmt(roll_when_min_pnl, 1)}",
-                )
-                return True
-            table.add_row(
-                f"{put.contract.localSymbol}",
-                "[cyan1]None",
-                f"[cyan1]Can't be rolled because P&L of {pfmt(pnl, 1)} is < {pfmt(roll_when_min_pnl, 1)}",
-            )
-
-        if pnl >= roll_when_pnl:
-            if self.config.roll_when.max_dte is not None:
-                table.add_row(
-                    f"{put.contract.localSymbol}",
-                    "[blue]Roll",
-                    f"[blue]Can be rolled because DTE of {dte} is <= {self.config.roll_when.max_dte} and P&L of {pfmt(pnl, 1)} is >= {pfmt(roll_when_pnl, 1)}",
-                )
-            else:
-                table.add_row(
-                    f"{put.contract.localSymbol}",
-                    "[blue]Roll",
-                    f"[blue]Can be rolled because P&L of {pfmt(pnl, 1)} is >= {pfmt(roll_when_pnl, 1)}",
-                )
-            return True
-
-        return False
+        kind = "calls" if right.startswith("C") else "puts"
+        roll_when = self.roll_when
+        roll_when_kind = getattr(roll_when, kind)
 
-    async def call_is_itm(self, contract: Contract) -> bool:
-        # Special case for handling VIX
-        if contract.symbol == "VIX":
-            vix_contract = Index("VIX", "CBOE", "USD")
-            ticker = await self.ibkr.get_ticker_for_contract(vix_contract)
-        else:
-            ticker = await self.ibkr.get_ticker_for_stock(
-                contract.symbol, contract.primaryExchange
+        try:
+            itm = (
+                self.roll_needs_itm_check(kind)
+                and isinstance(position.contract, Option)
+                and await self.option_is_itm(position.contract, right)
+            )
+        except RequiredFieldValidationError:
+            log.error(
+                f"Checking rollable {kind} failed for #{symbol}. Continuing anyway..."
             )
-        return contract.strike <= ticker.marketPrice()
-
-    def call_can_be_closed(self, call: PortfolioItem, table: Table) -> bool:
-        return self.position_can_be_closed(call, table)
-
-    async def call_can_be_rolled(self, call: PortfolioItem, table: Table) -> bool:
-        # Ignore long positions, we only roll shorts
-        if call.position > 0:
-            return False
-
-        if not self.config.trading_is_allowed(call.contract.symbol):
             return False
 
-        if (
-            isinstance(call.contract, Option)
-            and await self.call_is_itm(call.contract)
-            and self.config.roll_when.calls.always_when_itm
-        ):
+        if itm and roll_when_kind.always_when_itm:
             table.add_row(
-                f"{call.contract.localSymbol}",
+                f"{position.contract.localSymbol}",
                 "[blue]Roll",
-                f"[blue]Will be rolled because call is ITM "
-                f"and always_when_itm={self.config.roll_when.calls.always_when_itm}",
+                f"[blue]Will be rolled because {kind[:-1]} is ITM "
+                f"and always_when_itm={roll_when_kind.always_when_itm}",
             )
             return True
 
-        # Check if this call is ITM, and it's o.k. to roll
-        if (
-            not self.config.roll_when.calls.itm
-            and isinstance(call.contract, Option)
-            and await self.call_is_itm(call.contract)
-        ):
+        # Check if this option is ITM, and if it's o.k. to roll
+        if itm and not roll_when_kind.itm:
             return False
 
-        # Don't roll if there are excess CCs and we're configured not to roll
-        if (
-            call.contract.symbol in self.has_excess_calls
-            and not self.config.roll_when.calls.has_excess
-        ):
+        # Don't roll if there are excess contracts and we're configured not to roll
+        has_excess = (
+            self.has_excess_calls if right.startswith("C") else self.has_excess_puts
+        )
+        if symbol in has_excess and not roll_when_kind.has_excess:
             table.add_row(
-                f"{call.contract.localSymbol}",
+                f"{position.contract.localSymbol}",
                 "[cyan1]None",
-                f"[cyan1]Won't be rolled because there are excess calls for {call.contract.symbol}",
+                f"[cyan1]Won't be rolled because there are excess {kind} for {symbol}",
             )
             return False
 
-        dte = option_dte(call.contract.lastTradeDateOrContractMonth)
-        pnl = position_pnl(call)
+        dte = option_dte(position.contract.lastTradeDateOrContractMonth)
+        pnl = position_pnl(position)
 
-        roll_when_dte = self.config.roll_when.dte
-        roll_when_pnl = self.config.roll_when.pnl
-        roll_when_min_pnl = self.config.roll_when.min_pnl
+        roll_when_dte = roll_when.dte
+        roll_when_pnl = roll_when.pnl
+        roll_when_min_pnl = roll_when.min_pnl
+        roll_when_max_dte = roll_when.max_dte
 
-        if self.config.roll_when.max_dte and dte > self.config.roll_when.max_dte:
+        if roll_when_max_dte and dte > roll_when_max_dte:
             return False
 
+        pnl_str = pfmt(pnl, 1)
+
         if dte <= roll_when_dte:
             if pnl >= roll_when_min_pnl:
                 table.add_row(
-                    f"{call.contract.localSymbol}",
+                    f"{position.contract.localSymbol}",
                     "[blue]Roll",
-                    f"[blue]Can be rolled because DTE of {dte} is <= {self.config.roll_when.dte}"
-                    f" and P&L of {pfmt(pnl, 1)} is >= {pfmt(roll_when_min_pnl, 1)}",
+                    f"[blue]Can be rolled because DTE of {dte} is <= {roll_when_dte}"
+                    f" and P&L of {pnl_str} is >= {pfmt(roll_when_min_pnl, 1)}",
                 )
                 return True
             table.add_row(
-                f"{call.contract.localSymbol}",
+                f"{position.contract.localSymbol}",
                 "[cyan1]None",
-                f"[cyan1]Can't be rolled because P&L of {pfmt(pnl, 1)} is < {pfmt(roll_when_min_pnl, 1)}",
+                f"[cyan1]Can't be rolled because P&L of {pnl_str} is < {pfmt(roll_when_min_pnl, 1)}",
             )
 
         if pnl >= roll_when_pnl:
-            if self.config.roll_when.max_dte:
+            if roll_when_max_dte:
                 table.add_row(
-                    f"{call.contract.localSymbol}",
+                    f"{position.contract.localSymbol}",
                     "[blue]Roll",
-                    f"[blue]Can be rolled because DTE of {dte} is <= {self.config.roll_when.max_dte}"
-                    f" and P&L of {pfmt(pnl, 1)} is >= {pfmt(roll_when_pnl, 1)}",
+                    f"[blue]Can be rolled because DTE of {dte} is <= {roll_when_max_dte}"
+                    f" and P&L of {pnl_str} is >= {pfmt(roll_when_pnl, 1)}",
                 )
             else:
                 table.add_row(
-                    f"{call.contract.localSymbol}",
+                    f"{position.contract.localSymbol}",
                     "[blue]Roll",
-                    f"[blue]Can be rolled because P&L of {pfmt(pnl, 1)} is >= {pfmt(roll_when_pnl, 1)}",
+                    f"[blue]Can be rolled because P&L of {pnl_str} is >= {pfmt(roll_when_pnl, 1)}",
                 )
             return True
 
         return False
 
     def get_symbols(self) -> List[str]:
-        return list(self.config.symbols.keys())
+        return self.symbols
 
     def filter_positions(
         self, portfolio_positions: List[PortfolioItem]
     ) -> List[PortfolioItem]:
-        symbols = self.get_symbols()
+        # VIX and the cash fund are always included, regardless of whether
+        # the hedge or cash management are enabled
+        symbols = set(self.get_symbols())
+        symbols.add("VIX")
+        symbols.add(self.config.cash_management.cash_fund)
+        account_number = self.account_number
         return [
             item
             for item in portfolio_positions
-            if item.account == self.account_number
-            and (
-                item.contract.symbol in symbols
-                or item.contract.symbol == "VIX"
-                or item.contract.symbol == self.config.cash_management.cash_fund
-            )
+            if item.account == account_number
+            and item.contract.symbol in symbols
             and item.position != 0
             and item.averageCost != 0
         ]
@@ -342,25 +414,21 @@ class PortfolioManager:
         self.ibkr.set_market_data_type(self.config.account.market_data_type)
 
         if self.config.account.cancel_orders:
-            # Cancel any existing orders
-            open_trades = self.ibkr.open_trades()
-            for trade in open_trades:
-                if not trade.isDone() and (
-                    trade.contract.symbol in self.get_symbols()
-                    or (
-                        self.config.vix_call_hedge.enabled
-                        and trade.contract.symbol == "VIX"
-                    )
-                    or (
-                        self.config.cash_management.enabled
-                        and trade.contract.symbol
-                        == self.config.cash_management.cash_fund
-                    )
-                ):
-                    log.warning(
-                        f"{trade.contract.symbol}: Canceling order {trade.order}"
-                    )
-                    self.ibkr.cancel_order(trade.order)
+            # Cancel any existing orders for the symbols we manage
+            symbols = set(self.get_symbols())
+            if self.config.vix_call_hedge.enabled:
+                symbols.add("VIX")
+            if self.config.cash_management.enabled:
+                symbols.add(self.config.cash_management.cash_fund)
+
+            trades_to_cancel = [
+                trade
+                for trade in self.ibkr.open_trades()
+                if not trade.isDone() and trade.contract.symbol in symbols
+            ]
+            for trade in trades_to_cancel:
+                log.warning(f"{trade.contract.symbol}: Canceling order {trade.order}")
+                self.ibkr.cancel_order(trade.order)
 
     async def summarize_account(
         self,
@@ -400,56 +468,78 @@ class PortfolioManager:
 
         portfolio_positions = self.get_portfolio_positions()
 
-        position_values: Dict[int, Dict[str, str]] = {}
+        # Every option on the same underlying needs the same stock ticker for
+        # the ITM column, so fetch each underlying once before the concurrent
+        # position tasks run, rather than racing duplicate requests for it
+        await self.prefetch_stock_tickers(
+            [
+                (position.contract.symbol, position.contract.primaryExchange)
+                for positions in portfolio_positions.values()
+                for position in positions
+                if isinstance(position.contract, Option)
+                and position.contract.symbol != "VIX"
+            ],
+            description="Fetching underlying tickers...",
+        )
+
+        # One pre-formatted row per position (keyed by conId), in display
+        # column order, so the table can be filled without per-cell lookups
+        position_rows: Dict[int, Tuple[str, ...]] = {}
 
         async def is_itm(pos: PortfolioItem) -> str:
-            if isinstance(pos.contract, Option):
-                if pos.contract.right.startswith("C") and await self.call_is_itm(
-                    pos.contract
-                ):
-                    return "✔️"
-                if pos.contract.right.startswith("P") and await self.put_is_itm(
-                    pos.contract
-                ):
-                    return "✔️"
+            if isinstance(pos.contract, Option) and await self.option_is_itm(
+                pos.contract, pos.contract.right
+            ):
+                return "✔️"
             return ""
 
         async def load_position_task(pos: PortfolioItem) -> None:
-            position_values[pos.contract.conId] = {
-                "qty": (
+            values = (
+                (
                     ifmt(int(pos.position))
                     if pos.position.is_integer()
                     else ffmt(pos.position, 4)
                 ),
-                "mktprice": dfmt(pos.marketPrice),
-                "avgprice": dfmt(pos.averageCost),
-                "value": dfmt(pos.marketValue, 0),
-                "cost": dfmt(pos.averageCost * pos.position, 0),
-                "unrealized": dfmt(pos.unrealizedPNL, 0),
-                "p&l": pfmt(position_pnl(pos), 1),
-                "itm?": await is_itm(pos),
-            }
-            if isinstance(pos.contract, Option):
-                position_values[pos.contract.conId]["avgprice"] = dfmt(
-                    pos.averageCost / float(pos.contract.multiplier)
-                )
-                position_values[pos.contract.conId]["strike"] = dfmt(
-                    pos.contract.strike
-                )
-                position_values[pos.contract.conId]["dte"] = str(
-                    option_dte(pos.contract.lastTradeDateOrContractMonth)
+                dfmt(pos.marketPrice),
+            )
+            totals = (
+                dfmt(pos.marketValue, 0),
+                dfmt(pos.averageCost * pos.position, 0),
+                dfmt(pos.unrealizedPNL, 0),
+                pfmt(position_pnl(pos), 1),
+            )
+            if isinstance(pos.contract, Stock):
+                position_rows[pos.contract.conId] = (
+                    "S",
+                    *values,
+                    dfmt(pos.averageCost),
+                    *totals,
                 )
-                position_values[pos.contract.conId]["exp"] = str(
-                    pos.contract.lastTradeDateOrContractMonth
+            elif isinstance(pos.contract, Option):
+                position_rows[pos.contract.conId] = (
+                    pos.contract.right,
+                    *values,
+                    dfmt(pos.averageCost / float(pos.contract.multiplier)),
+                    *totals,
+                    dfmt(pos.contract.strike),
+                    str(pos.contract.lastTradeDateOrContractMonth),
+                    str(option_dte(pos.contract.lastTradeDateOrContractMonth)),
+                    await is_itm(pos),
                 )
 
         tasks = [
             load_position_task(position)
-            for _, positions in portfolio_positions.items()
+            for positions in portfolio_positions.values()
             for position in positions
         ]
         await log.track_async(tasks, "Loading portfolio positions...")
 
+        def sort_key(p: PortfolioItem) -> int:
+            # Keep stonks on top
+            if isinstance(p.contract, Option):
+                return option_dte(p.contract.lastTradeDateOrContractMonth)
+            return -1
+
         table = Table(
             title="Portfolio positions",
             collapse_padding=True,
@@ -468,53 +558,15 @@ class PortfolioManager:
         table.add_column("DTE", justify="right")
         table.add_column("ITM?")
         first = True
-        for symbol, position in portfolio_positions.items():
+        for symbol, positions in portfolio_positions.items():
             if not first:
                 table.add_section()
             first = False
             table.add_row(symbol)
-            sorted_positions = sorted(
-                position,
-                key=lambda p: (
-                    option_dte(p.contract.lastTradeDateOrContractMonth)
-                    if isinstance(p.contract, Option)
-                    else -1
-                ),  # Keep stonks on top
-            )
-
-            def getval(col: str, conId: int) -> str:
-                return position_values[conId][col]
-
-            for pos in sorted_positions:
-                conId = pos.contract.conId
-                if isinstance(pos.contract, Stock):
-                    table.add_row(
-                        "",
-                        "S",
-                        getval("qty", conId),
-                        getval("mktprice", conId),
-                        getval("avgprice", conId),
-                        getval("value", conId),
-                        getval("cost", conId),
-                        getval("unrealized", conId),
-                        getval("p&l", conId),
-                    )
-                elif isinstance(pos.contract, Option):
-                    table.add_row(
-                        "",
-                        pos.contract.right,
-                        getval("qty", conId),
-                        getval("mktprice", conId),
-                        getval("avgprice", conId),
-                        getval("value", conId),
-                        getval("cost", conId),
-                        getval("unrealized", conId),
-                        getval("p&l", conId),
-                        getval("strike", conId),
-                        getval("exp", conId),
-                        getval("dte", conId),
-                        getval("itm?", conId),
-                    )
+            for pos in sorted(positions, key=sort_key):
+                row = position_rows.get(pos.contract.conId)
+                if row:
+                    table.add_row("", *row)
 
         log.print(table)
 
@@ -522,51 +574,67 @@ class PortfolioManager:
 
     async def manage(self) -> None:
         try:
+            # The Watchdog calls manage() again on the same instance after a
+            # reconnect, and the reconnect drops every market data
+            # subscription. Tickers cached by an earlier run would stop
+            # updating, so start each run with an empty cache. The daily
+            # volatility also moves from one run to the next.
+            self.stock_tickers.clear()
+            self.stock_ticker_requests.clear()
+            self.daily_stddevs.clear()
+
             self.initialize_account()
             (account_summary, portfolio_positions) = await self.summarize_account()
+            position_aggregates = aggregate_positions(portfolio_positions)
 
             # Check if we have enough buying power to write some puts
             (
                 positions_table,
                 put_actions_table,
                 puts_to_write,
-            ) = await self.check_if_can_write_puts(account_summary, portfolio_positions)
-            log.print(positions_table)
-
-            # Look for lots of stock that don't have covered calls
-            (
-                call_actions_table,
-                calls_to_write,
-            ) = await self.check_for_uncovered_positions(
-                account_summary, portfolio_positions
+            ) = await self.check_if_can_write_puts(
+                account_summary, portfolio_positions, position_aggregates
+            )
+            log.print(Group(positions_table, put_actions_table))
+
+            # Look for lots of stock that don't have covered calls. This only
+            # needs the target quantities from the put check, so it can run
+            # while the puts are being written. The put writing log lines and
+            # both sets of progress bars share the console while they run, so
+            # the call actions table is only printed once both are done.
+            ((call_actions_table, calls_to_write), _) = await asyncio.gather(
+                self.check_for_uncovered_positions(
+                    account_summary, portfolio_positions, position_aggregates
+                ),
+                self.write_puts(puts_to_write),
             )
-
-            log.print(put_actions_table)
-            await self.write_puts(puts_to_write)
 
             log.print(call_actions_table)
             await self.write_calls(calls_to_write)
 
             # Refresh positions, in case anything changed from the orders above
             portfolio_positions = self.get_portfolio_positions()
+            position_aggregates = aggregate_positions(portfolio_positions)
 
-            (rollable_puts, closeable_puts, group1) = await self.check_puts(
-                portfolio_positions
-            )
-            (rollable_calls, closeable_calls, group2) = await self.check_calls(
-                portfolio_positions
+            # The put and call checks are independent, so let their market data
+            # requests overlap
+            (
+                (rollable_puts, closeable_puts, group1),
+                (rollable_calls, closeable_calls, group2),
+            ) = await asyncio.gather(
+                self.check_puts(portfolio_positions),
+                self.check_calls(portfolio_positions),
             )
             log.print(Panel(Group(group1, group2)))
 
-            await self.close_puts(
-                closeable_puts + await self.roll_puts(rollable_puts, account_summary)
-            )
-            await self.close_calls(
-                closeable_calls
-                + await self.roll_calls(
-                    rollable_calls, account_summary, portfolio_positions
+            closeable_puts.extend(await self.roll_puts(rollable_puts, account_summary))
+            await self.close_puts(closeable_puts)
+            closeable_calls.extend(
+                await self.roll_calls(
+                    rollable_calls, account_summary, position_aggregates
                 )
             )
+            await self.close_calls(closeable_calls)
 
             # check if we should do VIX call hedging
             await self.do_vix_hedging(account_summary, portfolio_positions)
@@ -604,9 +672,14 @@ class PortfolioManager:
         self, portfolio_positions: Dict[str, List[PortfolioItem]]
     ) -> Tuple[List[Any], List[Any], Group]:
         # Check for puts which may be rolled to the next expiration or a better price
-        puts = self.get_short_puts(portfolio_positions)
-        # Filter out an VIX positions
-        puts = [put for put in puts if put.contract.symbol != "VIX"]
+        # Positions are grouped by symbol, so the VIX positions can be skipped
+        # as a whole rather than filtered out afterwards
+        puts = [
+            put
+            for symbol, positions in portfolio_positions.items()
+            if symbol != "VIX"
+            for put in get_short_positions(positions, "P")
+        ]
 
         # find puts eligible to be rolled or closed
         rollable_puts: List[PortfolioItem] = []
@@ -625,14 +698,29 @@ class PortfolioManager:
             elif self.put_can_be_closed(put, table):
                 closeable_puts.append(put)
 
-        tasks = [check_put_can_be_rolled_task(put, table) for put in puts]
-        await log.track_async(tasks, "Checking rollable/closeable puts...")
+        # The ITM checks share one stock ticker per underlying, so make sure
+        # they're all fetched before the tasks run. Skip this when the roll
+        # config means the ITM check won't be made.
+        if self.roll_needs_itm_check("puts"):
+            await self.prefetch_stock_tickers(
+                [
+                    (put.contract.symbol, put.contract.primaryExchange)
+                    for put in puts
+                    if self.config.trading_is_allowed(put.contract.symbol)
+                ],
+                description="Fetching underlying tickers...",
+            )
 
-        total_rollable_puts = math.floor(sum([abs(p.position) for p in rollable_puts]))
-        total_closeable_puts = math.floor(
-            sum([abs(p.position) for p in closeable_puts])
+        tasks = [check_put_can_be_rolled_task(put, table) for put in puts]
+        await log.track_async(
+            tasks,
+            "Checking rollable/closeable puts...",
+            max_concurrency=self.config.ib_async.max_concurrency,
         )
 
+        total_rollable_puts = int(sum(abs(p.position) for p in rollable_puts))
+        total_closeable_puts = int(sum(abs(p.position) for p in closeable_puts))
+
         text1 = f"[magenta]{total_rollable_puts} puts can be rolled"
         text2 = f"[magenta]{total_closeable_puts} puts can be closed"
 
@@ -647,9 +735,14 @@ class PortfolioManager:
         self, portfolio_positions: Dict[str, List[PortfolioItem]]
     ) -> Tuple[List[Any], List[Any], Group]:
         # Check for calls which may be rolled to the next expiration or a better price
-        calls = self.get_short_calls(portfolio_positions)
-        # Filter out an VIX positions
-        calls = [call for call in calls if call.contract.symbol != "VIX"]
+        # Positions are grouped by symbol, so the VIX positions can be skipped
+        # as a whole rather than filtered out afterwards
+        calls = [
+            call
+            for symbol, positions in portfolio_positions.items()
+            if symbol != "VIX"
+            for call in get_short_positions(positions, "C")
+        ]
 
         # find calls eligible to be rolled
         rollable_calls: List[PortfolioItem] = []
@@ -660,21 +753,37 @@ class PortfolioManager:
         table.add_column("Action")
         table.add_column("Detail")
 
-        for c in log.track(
-            calls, description="Checking rollable/closeable calls...", total=len(calls)
-        ):
-            if await self.call_can_be_rolled(c, table):
-                rollable_calls.append(c)
-            elif self.call_can_be_closed(c, table):
-                closeable_calls.append(c)
+        async def check_call_can_be_rolled_task(
+            call: PortfolioItem, table: Table
+        ) -> None:
+            if await self.call_can_be_rolled(call, table):
+                rollable_calls.append(call)
+            elif self.call_can_be_closed(call, table):
+                closeable_calls.append(call)
+
+        # The ITM checks share one stock ticker per underlying, so make sure
+        # they're all fetched before the tasks run. Skip this when the roll
+        # config means the ITM check won't be made.
+        if self.roll_needs_itm_check("calls"):
+            await self.prefetch_stock_tickers(
+                [
+                    (call.contract.symbol, call.contract.primaryExchange)
+                    for call in calls
+                    if self.config.trading_is_allowed(call.contract.symbol)
+                ],
+                description="Fetching underlying tickers...",
+            )
 
-        total_rollable_calls = math.floor(
-            sum([abs(p.position) for p in rollable_calls])
-        )
-        total_closeable_calls = math.floor(
-            sum([abs(p.position) for p in closeable_calls])
+        tasks = [check_call_can_be_rolled_task(call, table) for call in calls]
+        await log.track_async(
+            tasks,
+            "Checking rollable/closeable calls...",
+            max_concurrency=self.config.ib_async.max_concurrency,
         )
 
+        total_rollable_calls = int(sum(abs(p.position) for p in rollable_calls))
+        total_closeable_calls = int(sum(abs(p.position) for p in closeable_calls))
+
         text1 = f"[magenta]{total_rollable_calls} calls can be rolled"
         text2 = f"[magenta]{total_closeable_calls} calls can be closed"
 
@@ -689,24 +798,24 @@ class PortfolioManager:
         self,
         symbol: str,
         primary_exchange: str,
-        account_summary: Dict[str, AccountValue],
+        total_buying_power: int,
     ) -> int:
-        total_buying_power = self.get_buying_power(account_summary)
         max_buying_power = (
-            self.config.target.maximum_new_contracts_percent * total_buying_power
+            self.target.maximum_new_contracts_percent * total_buying_power
         )
-        ticker = await self.ibkr.get_ticker_for_stock(
+        ticker = await self.get_ticker_for_stock(
             symbol,
             primary_exchange,
         )
         price = midpoint_or_market_price(ticker)
 
-        return max([1, round((max_buying_power / price) // 100)])
+        return max(1, round((max_buying_power / price) // 100))
 
     async def check_for_uncovered_positions(
         self,
         account_summary: Dict[str, AccountValue],
         portfolio_positions: Dict[str, List[PortfolioItem]],
+        position_aggregates: Dict[str, PositionAggregates],
     ) -> Tuple[Table, List[Tuple[str, str, int, int]]]:
         call_actions_table = Table(title="Call writing summary")
         call_actions_table.add_column("Symbol")
@@ -716,35 +825,41 @@ class PortfolioManager:
 
         to_write: List[Tuple[str, str, int, int]] = []
         symbols = set(self.get_symbols())
+        total_buying_power = self.get_buying_power(account_summary)
+
+        # Every task needs the stock ticker, so fetch any we don't have yet in
+        # one batch up front
+        await self.prefetch_stock_tickers(
+            [
+                (symbol, self.get_primary_exchange(symbol))
+                for symbol in portfolio_positions
+                if symbol in symbols
+            ]
+        )
+
+        excess_call_symbols: set[str] = set()
 
-        async def update_to_write_task(symbol: str) -> None:
+        async def update_to_write_task(
+            symbol: str,
+        ) -> Tuple[str, List[Tuple[str, str]], Optional[Tuple[str, str, int, int]]]:
+            # Table rows are collected here and added once every task is done,
+            # so no formatting or table updates happen between awaits
+            rows: List[Tuple[str, str]] = []
             if symbol not in symbols:
                 # skip positions we don't care about
-                return
+                return (symbol, rows, None)
+            primary_exchange = self.get_primary_exchange(symbol)
+            aggregates = position_aggregates[symbol]
             short_call_count = (
                 calculate_net_short_positions(portfolio_positions[symbol], "C")
                 if calculate_net_contracts
-                else count_short_option_positions(portfolio_positions[symbol], "C")
-            )
-            stock_count = math.floor(
-                sum(
-                    [
-                        p.position
-                        for p in portfolio_positions[symbol]
-                        if isinstance(p.contract, Stock)
-                    ]
-                )
+                else aggregates.short_call_count
             )
+            stock_count = aggregates.stock_count
             strike_limit = math.ceil(
                 max(
-                    [
-                        self.config.get_strike_limit(symbol, "C") or 0,
-                    ]
-                    + [
-                        p.averageCost or 0
-                        for p in portfolio_positions[symbol]
-                        if isinstance(p.contract, Stock)
-                    ]
+                    self.config.get_strike_limit(symbol, "C") or 0,
+                    aggregates.max_stock_average_cost,
                 )
             )
 
@@ -755,26 +870,28 @@ class PortfolioManager:
             excess_calls = short_call_count - target_short_calls
 
             if excess_calls > 0:
-                self.has_excess_calls.add(symbol)
-                call_actions_table.add_row(
-                    symbol,
-                    "[yellow]None",
-                    f"[yellow]Warning: excess_calls={excess_calls} stock_count={stock_count},"
-                    f" short_call_count={short_call_count}, target_short_calls={target_short_calls}",
+                excess_call_symbols.add(symbol)
+                rows.append(
+                    (
+                        "[yellow]None",
+                        f"[yellow]Warning: excess_calls={excess_calls} stock_count={stock_count},"
+                        f" short_call_count={short_call_count}, target_short_calls={target_short_calls}",
+                    )
                 )
 
-            maximum_new_contracts = await self.get_maximum_new_contracts_for(
-                symbol,
-                self.get_primary_exchange(symbol),
-                account_summary,
-            )
-            calls_to_write = max(
-                [0, min([new_contracts_needed, maximum_new_contracts])]
+            # The contract cap only matters if there are calls to write
+            maximum_new_contracts = (
+                await self.get_maximum_new_contracts_for(
+                    symbol,
+                    primary_exchange,
+                    total_buying_power,
+                )
+                if new_contracts_needed > 0
+                else 0
             )
+            calls_to_write = max(0, min(new_contracts_needed, maximum_new_contracts))
 
-            ticker = await self.ibkr.get_ticker_for_stock(
-                symbol, self.get_primary_exchange(symbol)
-            )
+            ticker = await self.get_ticker_for_stock(symbol, primary_exchange)
 
             (write_threshold, absolute_daily_change) = (None, None)
 
@@ -794,19 +911,22 @@ class PortfolioManager:
                 (can_write_when_green, can_write_when_red) = self.config.can_write_when(
                     symbol, "C"
                 )
+                market_price = ticker.marketPrice()
 
-                if not can_write_when_green and ticker.marketPrice() > ticker.close:
-                    call_actions_table.add_row(
-                        symbol,
-                        "[cyan1]None",
-                        f"[cyan1]Skipping because can_write_when_green={can_write_when_green} and marketPrice={ticker.marketPrice():.2f} > close={ticker.close}",
+                if not can_write_when_green and market_price > ticker.close:
+                    rows.append(
+                        (
+                            "[cyan1]None",
+                            f"[cyan1]Skipping because can_write_when_green={can_write_when_green} and marketPrice={market_price:.2f} > close={ticker.close}",
+                        )
                     )
                     return False
-                if not can_write_when_red and ticker.marketPrice() < ticker.close:
-                    call_actions_table.add_row(
-                        symbol,
-                        "[cyan1]None",
-                        f"[cyan1]Skipping because can_write_when_red={can_write_when_red} and marketPrice={ticker.marketPrice():.2f} < close={ticker.close}",
+                if not can_write_when_red and market_price < ticker.close:
+                    rows.append(
+                        (
+                            "[cyan1]None",
+                            f"[cyan1]Skipping because can_write_when_red={can_write_when_red} and marketPrice={market_price:.2f} < close={ticker.close}",
+                        )
                     )
                     return False
 
@@ -815,96 +935,103 @@ class PortfolioManager:
                     absolute_daily_change,
                 ) = await self.get_write_threshold(ticker, "C")
                 if absolute_daily_change < write_threshold:
-                    call_actions_table.add_row(
-                        symbol,
-                        "[cyan1]None",
-                        f"[cyan1]Need to write {calls_to_write} calls, "
-                        f"but skipping because absolute_daily_change={absolute_daily_change:.2f}"
-                        f" less than write_threshold={write_threshold:.2f}",
+                    rows.append(
+                        (
+                            "[cyan1]None",
+                            f"[cyan1]Need to write {calls_to_write} calls, "
+                            f"but skipping because absolute_daily_change={absolute_daily_change:.2f}"
+                            f" less than write_threshold={write_threshold:.2f}",
+                        )
                     )
                     return False
                 return True
 
             ok_to_write = await is_ok_to_write_calls(symbol, ticker, calls_to_write)
-            strike_limit = math.ceil(max([strike_limit, ticker.marketPrice()]))
+            strike_limit = math.ceil(max(strike_limit, ticker.marketPrice()))
 
             if calls_to_write > 0 and ok_to_write:
-                call_actions_table.add_row(
-                    symbol,
-                    "[green]Write",
-                    f"[green]Will write {calls_to_write} calls, {new_contracts_needed} needed, "
-                    f"limited to {maximum_new_contracts} new contracts, at or above strike {dfmt(strike_limit)}"
-                    f" (target_short_calls={target_short_calls} short_call_count={short_call_count} "
-                    f"absolute_daily_change={absolute_daily_change:.2f} write_threshold={write_threshold:.2f})",
-                )
-                to_write.append(
+                rows.append(
                     (
-                        symbol,
-                        self.get_primary_exchange(symbol),
-                        calls_to_write,
-                        strike_limit,
+                        "[green]Write",
+                        f"[green]Will write {calls_to_write} calls, {new_contracts_needed} needed, "
+                        f"limited to {maximum_new_contracts} new contracts, at or above strike {dfmt(strike_limit)}"
+                        f" (target_short_calls={target_short_calls} short_call_count={short_call_count} "
+                        f"absolute_daily_change={absolute_daily_change:.2f} write_threshold={write_threshold:.2f})",
                     )
                 )
+                return (
+                    symbol,
+                    rows,
+                    (symbol, primary_exchange, calls_to_write, strike_limit),
+                )
+            return (symbol, rows, None)
 
         tasks = [update_to_write_task(symbol) for symbol in portfolio_positions]
-        await log.track_async(tasks, description="Checking for uncovered positions...")
+        results = await log.track_async(
+            tasks,
+            description="Checking for uncovered positions...",
+            max_concurrency=self.config.ib_async.max_concurrency,
+        )
 
-        return (call_actions_table, to_write)
+        self.has_excess_calls |= excess_call_symbols
 
-    async def write_calls(self, calls: List[Any]) -> None:
-        for symbol, primary_exchange, quantity, strike_limit in calls:
-            try:
-                sell_ticker = await self.find_eligible_contracts(
-                    Stock(
-                        symbol,
-                        self.get_order_exchange(),
-                        currency="USD",
-                        primaryExchange=primary_exchange,
-                    ),
-                    "C",
-                    strike_limit,
-                    minimum_price=lambda: self.config.orders.minimum_credit,
-                )
-            except (RuntimeError, NoValidContractsError):
-                log.error(
-                    f"{symbol}: Finding eligible contracts failed. Continuing anyway..."
-                )
-                continue
+        # Tasks complete in any order, so emit rows in position order
+        results_by_symbol = {symbol: (rows, write) for (symbol, rows, write) in results}
+        for symbol in portfolio_positions:
+            (rows, write) = results_by_symbol[symbol]
+            for row in rows:
+                call_actions_table.add_row(symbol, *row)
+            if write:
+                to_write.append(write)
 
-            # Create order
-            order = LimitOrder(
-                "SELL",
-                quantity,
-                round(get_higher_price(sell_ticker), 2),
-                algoStrategy=self.get_algo_strategy(),
-                algoParams=self.get_algo_params(),
-                tif="DAY",
-                account=self.account_number,
-            )
+        return (call_actions_table, to_write)
 
-            # Enqueue order
-            self.enqueue_order(sell_ticker.contract, order)
+    async def write_calls(self, calls: List[Any]) -> None:
+        await self.write_options(calls, "C")
 
     async def write_puts(
         self, puts: List[Tuple[str, str, int, Optional[float]]]
     ) -> None:
-        for symbol, primary_exchange, quantity, strike_limit in puts:
-            try:
-                sell_ticker = await self.find_eligible_contracts(
-                    Stock(
-                        symbol,
-                        self.get_order_exchange(),
-                        currency="USD",
-                        primaryExchange=primary_exchange,
-                    ),
-                    "P",
-                    strike_limit,
-                    minimum_price=lambda: self.config.orders.minimum_credit,
-                )
-            except (RuntimeError, NoValidContractsError):
-                log.error(
-                    f"{symbol}: Finding eligible contracts failed. Continuing anyway..."
-                )
+        await self.write_options(puts, "P")
+
+    async def write_options(
+        self, options: List[Tuple[str, str, int, Optional[float]]], right: str
+    ) -> None:
+        if not options:
+            return
+
+        # Scanning the option chain takes several round trips per symbol, so
+        # scan symbols concurrently, up to the configured limit
+        semaphore = asyncio.Semaphore(self.config.ib_async.max_concurrency)
+
+        async def find_sell_ticker(
+            symbol: str, primary_exchange: str, strike_limit: Optional[float]
+        ) -> Optional[Ticker]:
+            async with semaphore:
+                try:
+                    return await self.find_eligible_contracts(
+                        self.get_stock_contract(symbol, primary_exchange),
+                        right,
+                        strike_limit,
+                        minimum_price=lambda: self.config.orders.minimum_credit,
+                    )
+                except (RuntimeError, NoValidContractsError):
+                    log.error(
+                        f"{symbol}: Finding eligible contracts failed. Continuing anyway..."
+                    )
+                    return None
+
+        sell_tickers = await asyncio.gather(
+            *[
+                find_sell_ticker(symbol, primary_exchange, strike_limit)
+                for symbol, primary_exchange, _, strike_limit in options
+            ]
+        )
+
+        # Enqueue orders in the original symbol order, regardless of which
+        # scan finished first
+        for (_, _, quantity, _), sell_ticker in zip(options, sell_tickers):
+            if not sell_ticker:
                 continue
 
             # Create order
@@ -922,7 +1049,7 @@ class PortfolioManager:
             self.enqueue_order(sell_ticker.contract, order)
 
     def get_primary_exchange(self, symbol: str) -> str:
-        return self.config.symbols[symbol].primary_exchange
+        return self.primary_exchanges[symbol]
 
     def get_buying_power(self, account_summary: Dict[str, AccountValue]) -> int:
         return math.floor(
@@ -934,21 +1061,24 @@ class PortfolioManager:
         self,
         account_summary: Dict[str, AccountValue],
         portfolio_positions: Dict[str, List[PortfolioItem]],
+        position_aggregates: Dict[str, PositionAggregates],
     ) -> Tuple[Table, Table, List[Tuple[str, str, int, Optional[float]]]]:
-        # Get stock positions
-        stock_positions = [
-            position
-            for symbol in portfolio_positions
-            for position in portfolio_positions[symbol]
-            if isinstance(position.contract, Stock)
-        ]
+        # A zero-weight symbol that we don't hold has nothing to write or
+        # cover, so there's no need to request market data for it
+        def needs_ticker(symbol: str) -> bool:
+            return bool(self.config.symbols[symbol].weight) or (
+                symbol in portfolio_positions
+            )
 
-        total_buying_power = self.get_buying_power(account_summary)
+        await self.prefetch_stock_tickers(
+            [
+                (symbol, self.get_primary_exchange(symbol))
+                for symbol in self.get_symbols()
+                if needs_ticker(symbol)
+            ]
+        )
 
-        stock_symbols: Dict[str, PortfolioItem] = dict()
-        for stock in stock_positions:
-            symbol = stock.contract.symbol
-            stock_symbols[symbol] = stock
+        total_buying_power = self.get_buying_power(account_summary)
 
         targets: Dict[str, float] = dict()
         target_additional_quantity: Dict[str, Dict[str, int | bool]] = dict()
@@ -961,14 +1091,11 @@ class PortfolioManager:
         )
         positions_summary_table.add_column("Symbol")
         positions_summary_table.add_column("Shares", justify="right")
-        positions_summary_table.add_column("Short puts", justify="right")
-        positions_summary_table.add_column("Long puts", justify="right")
-        if calculate_net_contracts:
-            positions_summary_table.add_column("Net short puts", justify="right")
-        positions_summary_table.add_column("Short calls", justify="right")
-        positions_summary_table.add_column("Long calls", justify="right")
-        if calculate_net_contracts:
-            positions_summary_table.add_column("Net short calls", justify="right")
+        for kind in ("puts", "calls"):
+            positions_summary_table.add_column(f"Short {kind}", justify="right")
+            positions_summary_table.add_column(f"Long {kind}", justify="right")
+            if calculate_net_contracts:
+                positions_summary_table.add_column(f"Net short {kind}", justify="right")
         positions_summary_table.add_column("Target value", justify="right")
         positions_summary_table.add_column("Target share qty", justify="right")
         positions_summary_table.add_column("Net target shares", justify="right")
@@ -979,57 +1106,46 @@ class PortfolioManager:
         put_actions_table.add_column("Action")
         put_actions_table.add_column("Detail")
 
-        async def calculate_target_position_task(symbol: str) -> None:
-            ticker = await self.ibkr.get_ticker_for_stock(
-                symbol, self.get_primary_exchange(symbol)
-            )
+        # Rows are collected per symbol and added to the tables once all the
+        # tasks are done, so they come out in symbol order
+        summary_rows: Dict[str, Tuple[List[str], List[str]]] = {}
+        skip_details: Dict[str, str] = {}
 
-            current_position = math.floor(
-                stock_symbols[symbol].position if symbol in stock_symbols else 0
-            )
+        async def calculate_target_position_task(symbol: str) -> None:
+            aggregates = position_aggregates.get(symbol, PositionAggregates())
+            current_position = aggregates.stock_count
 
             targets[symbol] = round(
                 self.config.symbols[symbol].weight * total_buying_power, 2
             )
-            market_price = ticker.marketPrice()
-            if (
-                not market_price
-                or math.isnan(market_price)
-                or math.isclose(market_price, 0)
-            ):
-                log.error(
-                    f"Invalid market price for {symbol} (market_price={market_price}), skipping for now"
+            ticker: Optional[Ticker] = None
+            if needs_ticker(symbol):
+                ticker = await self.get_ticker_for_stock(
+                    symbol, self.get_primary_exchange(symbol)
                 )
-                return
-            self.target_quantities[symbol] = math.floor(targets[symbol] / market_price)
+                market_price = ticker.marketPrice()
+                if not market_price or util.isNan(market_price):
+                    log.error(
+                        f"Invalid market price for {symbol} (market_price={market_price}), skipping for now"
+                    )
+                    return
+                self.target_quantities[symbol] = math.floor(
+                    targets[symbol] / market_price
+                )
+            else:
+                self.target_quantities[symbol] = 0
 
             if symbol in portfolio_positions:
                 # Current number of puts
-                net_short_put_count = short_put_count = count_short_option_positions(
-                    portfolio_positions[symbol], "P"
-                )
-                short_put_avg_strike = weighted_avg_short_strike(
-                    portfolio_positions[symbol], "P"
-                )
-                long_put_count = count_long_option_positions(
-                    portfolio_positions[symbol], "P"
-                )
-                long_put_avg_strike = weighted_avg_long_strike(
-                    portfolio_positions[symbol], "P"
-                )
+                net_short_put_count = short_put_count = aggregates.short_put_count
+                short_put_avg_strike = aggregates.short_put_avg_strike
+                long_put_count = aggregates.long_put_count
+                long_put_avg_strike = aggregates.long_put_avg_strike
                 # Current number of calls
-                net_short_call_count = short_call_count = count_short_option_positions(
-                    portfolio_positions[symbol], "C"
-                )
-                short_call_avg_strike = weighted_avg_short_strike(
-                    portfolio_positions[symbol], "C"
-                )
-                long_call_count = count_long_option_positions(
-                    portfolio_positions[symbol], "C"
-                )
-                long_call_avg_strike = weighted_avg_long_strike(
-                    portfolio_positions[symbol], "C"
-                )
+                net_short_call_count = short_call_count = aggregates.short_call_count
+                short_call_avg_strike = aggregates.short_call_avg_strike
+                long_call_count = aggregates.long_call_count
+                long_call_avg_strike = aggregates.long_call_avg_strike
 
                 if calculate_net_contracts:
                     net_short_put_count = calculate_net_short_positions(
@@ -1052,77 +1168,60 @@ class PortfolioManager:
             net_target_shares = qty_to_write
             net_target_puts = net_target_shares // 100
 
+            put_columns = [ifmt(short_put_count), ifmt(long_put_count)]
+            call_columns = [ifmt(short_call_count), ifmt(long_call_count)]
+            put_strike_columns = [
+                dfmt(short_put_avg_strike),
+                dfmt(long_put_avg_strike),
+            ]
+            call_strike_columns = [
+                dfmt(short_call_avg_strike),
+                dfmt(long_call_avg_strike),
+            ]
             if calculate_net_contracts:
-                positions_summary_table.add_row(
-                    symbol,
-                    ifmt(current_position),
-                    ifmt(short_put_count),
-                    ifmt(long_put_count),
-                    ifmt(net_short_put_count),
-                    ifmt(short_call_count),
-                    ifmt(long_call_count),
-                    ifmt(net_short_call_count),
-                    dfmt(targets[symbol]),
-                    ifmt(self.target_quantities[symbol]),
-                    ifmt(net_target_shares),
-                    ifmt(net_target_puts),
-                )
-                positions_summary_table.add_row(
-                    "",
-                    "",
-                    dfmt(short_put_avg_strike),
-                    dfmt(long_put_avg_strike),
-                    "",
-                    dfmt(short_call_avg_strike),
-                    dfmt(long_call_avg_strike),
-                )
-            else:
-                positions_summary_table.add_row(
+                put_columns.append(ifmt(net_short_put_count))
+                call_columns.append(ifmt(net_short_call_count))
+                put_strike_columns.append("")
+
+            summary_rows[symbol] = (
+                [
                     symbol,
                     ifmt(current_position),
-                    ifmt(short_put_count),
-                    ifmt(long_put_count),
-                    ifmt(short_call_count),
-                    ifmt(long_call_count),
+                    *put_columns,
+                    *call_columns,
                     dfmt(targets[symbol]),
                     ifmt(self.target_quantities[symbol]),
                     ifmt(net_target_shares),
                     ifmt(net_target_puts),
-                )
-                positions_summary_table.add_row(
-                    "",
-                    "",
-                    dfmt(short_put_avg_strike),
-                    dfmt(long_put_avg_strike),
-                    dfmt(short_call_avg_strike),
-                    dfmt(long_call_avg_strike),
-                )
-            positions_summary_table.add_section()
+                ],
+                ["", "", *put_strike_columns, *call_strike_columns],
+            )
 
             async def is_ok_to_write_puts(
                 symbol: str,
-                ticker: Ticker,
+                ticker: Optional[Ticker],
                 puts_to_write: int,
             ) -> bool:
-                if puts_to_write <= 0 or not self.config.trading_is_allowed(symbol):
+                if (
+                    puts_to_write <= 0
+                    or ticker is None
+                    or not self.config.trading_is_allowed(symbol)
+                ):
                     return False
 
                 (can_write_when_green, can_write_when_red) = self.config.can_write_when(
                     symbol, "P"
                 )
+                market_price = ticker.marketPrice()
 
-                if not can_write_when_green and ticker.marketPrice() > ticker.close:
-                    put_actions_table.add_row(
-                        symbol,
-                        "[cyan1]None",
-                        f"[cyan1]Skipping because can_write_when_green={can_write_when_green} and marketPrice={ticker.marketPrice():.2f} > close={ticker.close}",
+                if not can_write_when_green and market_price > ticker.close:
+                    skip_details[symbol] = (
+                        f"[cyan1]Skipping because can_write_when_green={can_write_when_green} and marketPrice={market_price:.2f} > close={ticker.close}"
                     )
                     return False
-                if not can_write_when_red and ticker.marketPrice() < ticker.close:
-                    put_actions_table.add_row(
-                        symbol,
-                        "[cyan1]None",
-                        f"[cyan1]Skipping because can_write_when_red={can_write_when_red} and marketPrice={ticker.marketPrice():.2f} < close={ticker.close}",
+                if not can_write_when_red and market_price < ticker.close:
+                    skip_details[symbol] = (
+                        f"[cyan1]Skipping because can_write_when_red={can_write_when_red} and marketPrice={market_price:.2f} < close={ticker.close}"
                     )
                     return False
 
@@ -1131,10 +1230,8 @@ class PortfolioManager:
                     absolute_daily_change,
                 ) = await self.get_write_threshold(ticker, "P")
                 if absolute_daily_change < write_threshold:
-                    put_actions_table.add_row(
-                        symbol,
-                        "[cyan1]None",
-                        f"[cyan1]Need to write {puts_to_write} puts, but skipping because absolute_daily_change={absolute_daily_change:.2f} less than write_threshold={write_threshold:.2f}[/cyan1]",
+                    skip_details[symbol] = (
+                        f"[cyan1]Need to write {puts_to_write} puts, but skipping because absolute_daily_change={absolute_daily_change:.2f} less than write_threshold={write_threshold:.2f}[/cyan1]"
                     )
                     return False
                 return True
@@ -1150,63 +1247,93 @@ class PortfolioManager:
             calculate_target_position_task(symbol)
             for symbol in self.config.symbols.keys()
         ]
-        await log.track_async(tasks, description="Calculating target positions...")
+        await log.track_async(
+            tasks,
+            description="Calculating target positions...",
+            max_concurrency=self.config.ib_async.max_concurrency,
+        )
+
+        for symbol in self.get_symbols():
+            if symbol in summary_rows:
+                (row, strike_row) = summary_rows[symbol]
+                positions_summary_table.add_row(*row)
+                positions_summary_table.add_row(*strike_row)
+                positions_summary_table.add_section()
+            if symbol in skip_details:
+                put_actions_table.add_row(symbol, "[cyan1]None", skip_details[symbol])
 
         to_write: List[Tuple[str, str, int, Optional[float]]] = []
 
+        excess_put_symbols: set[str] = set()
+
         async def update_to_write_task(
             symbol: str, target: Dict[str, int | bool]
-        ) -> None:
+        ) -> Tuple[
+            str,
+            Optional[Tuple[str, str]],
+            Optional[Tuple[str, str, int, Optional[float]]],
+        ]:
             ok_to_write = target["ok_to_write"]
             additional_quantity = target["qty"]
             # NOTE: it's possible there are non-standard option contract sizes,
             # like with futures, but we don't bother handling those cases.
             # Please don't use this code with futures.
             if additional_quantity >= 1 and ok_to_write:
+                primary_exchange = self.get_primary_exchange(symbol)
                 maximum_new_contracts = await self.get_maximum_new_contracts_for(
                     symbol,
-                    self.get_primary_exchange(symbol),
-                    account_summary,
+                    primary_exchange,
+                    total_buying_power,
                 )
-                puts_to_write = min([additional_quantity, maximum_new_contracts])
+                puts_to_write = min(additional_quantity, maximum_new_contracts)
                 if puts_to_write > 0:
                     strike_limit = self.config.get_strike_limit(symbol, "P")
+                    detail = (
+                        f"[green]Will write {puts_to_write} puts, {additional_quantity}"
+                        f" needed, capped at {maximum_new_contracts}"
+                    )
                     if strike_limit:
-                        put_actions_table.add_row(
-                            symbol,
-                            "[green]Write",
-                            f"[green]Will write {puts_to_write} puts, {additional_quantity}"
-                            f" needed, capped at {maximum_new_contracts}, at or below strike ${strike_limit}",
-                        )
-                    else:
-                        put_actions_table.add_row(
-                            symbol,
-                            "[green]Write",
-                            f"[green]Will write {puts_to_write} puts, {additional_quantity}"
-                            f" needed, capped at {maximum_new_contracts}",
-                        )
-                    to_write.append(
-                        (
-                            symbol,
-                            self.get_primary_exchange(symbol),
-                            puts_to_write,
-                            strike_limit,
-                        )
+                        detail += f", at or below strike ${strike_limit}"
+                    return (
+                        symbol,
+                        ("[green]Write", detail),
+                        (symbol, primary_exchange, puts_to_write, strike_limit),
                     )
             elif additional_quantity < 0:
-                self.has_excess_puts.add(symbol)
-                put_actions_table.add_row(
+                excess_put_symbols.add(symbol)
+                return (
                     symbol,
-                    "[yellow]None",
-                    "[yellow]Warning: excess positions based "
-                    "on net liquidation and target margin usage",
+                    (
+                        "[yellow]None",
+                        "[yellow]Warning: excess positions based "
+                        "on net liquidation and target margin usage",
+                    ),
+                    None,
                 )
+            return (symbol, None, None)
 
         tasks = [
             update_to_write_task(symbol, target)
             for symbol, target in target_additional_quantity.items()
         ]
-        await log.track_async(tasks, description="Generating positions summary...")
+        results = await log.track_async(
+            tasks,
+            description="Generating positions summary...",
+            max_concurrency=self.config.ib_async.max_concurrency,
+        )
+
+        self.has_excess_puts |= excess_put_symbols
+
+        # Tasks complete in any order, so emit rows in symbol order
+        results_by_symbol = {symbol: (row, write) for (symbol, row, write) in results}
+        for symbol in self.get_symbols():
+            if symbol not in results_by_symbol:
+                continue
+            (row, write) = results_by_symbol[symbol]
+            if row:
+                put_actions_table.add_row(symbol, *row)
+            if write:
+                to_write.append(write)
 
         return (positions_summary_table, put_actions_table, to_write)
 
@@ -1227,248 +1354,293 @@ class PortfolioManager:
         self,
         calls: List[PortfolioItem],
         account_summary: Dict[str, AccountValue],
-        portfolio_positions: Dict[str, List[PortfolioItem]],
+        position_aggregates: Dict[str, PositionAggregates],
     ) -> List[PortfolioItem]:
         return await self.roll_positions(
-            calls, "C", account_summary, portfolio_positions
+            calls, "C", account_summary, position_aggregates
         )
 
     async def close_positions(self, right: str, positions: List[PortfolioItem]) -> None:
+        if not positions:
+            return
+
         log.notice(f"Close {right} positions...")
-        for position in positions:
-            try:
-                position.contract.exchange = self.get_order_exchange()
-                price = None
-                ticker = await self.ibkr.get_ticker_for_contract(
-                    position.contract,
-                    required_fields=[],
-                    optional_fields=[TickerField.MIDPOINT, TickerField.MARKET_PRICE],
-                )
-                is_short = position.position < 0
-                price = (
-                    round(get_lower_price(ticker), 2)
-                    if is_short
-                    else round(get_higher_price(ticker), 2)
-                )
-                if not price or util.isNan(price) or math.isnan(price):
-                    # if the price is near zero or NaN, use the minimum price
-                    log.warning(
-                        f"Market price data unavailable for {position.contract.localSymbol}, using ticker.minTick={ticker.minTick}"
+        order_exchange = self.get_order_exchange()
+
+        # Fetch the closing prices concurrently, up to the configured limit
+        semaphore = asyncio.Semaphore(self.config.ib_async.max_concurrency)
+
+        async def close_position_task(
+            position: PortfolioItem,
+        ) -> Optional[Tuple[Contract, LimitOrder]]:
+            async with semaphore:
+                try:
+                    position.contract.exchange = order_exchange
+                    price = None
+                    ticker = await self.ibkr.get_ticker_for_contract(
+                        position.contract,
+                        required_fields=[],
+                        optional_fields=[
+                            TickerField.MIDPOINT,
+                            TickerField.MARKET_PRICE,
+                        ],
                     )
-                    price = ticker.minTick
-
-                qty = abs(position.position)
-                order = LimitOrder(
-                    "BUY" if is_short else "SELL",
-                    qty,
-                    price,
-                    algoStrategy=self.get_algo_strategy(),
-                    algoParams=self.get_algo_params(),
-                    tif="DAY",
-                    account=self.account_number,
-                )
+                    is_short = position.position < 0
+                    price = (
+                        round(get_lower_price(ticker), 2)
+                        if is_short
+                        else round(get_higher_price(ticker), 2)
+                    )
+                    if not price or util.isNan(price):
+                        # if the price is near zero or NaN, use the minimum price
+                        log.warning(
+                            f"Market price data unavailable for {position.contract.localSymbol}, using ticker.minTick={ticker.minTick}"
+                        )
+                        price = ticker.minTick
 
-                self.enqueue_order(ticker.contract, order)
-            except RuntimeError:
-                log.error(
-                    "Error occurred when trying to close position. Continuing anyway..."
-                )
-                continue
+                    qty = abs(position.position)
+                    order = LimitOrder(
+                        "BUY" if is_short else "SELL",
+                        qty,
+                        price,
+                        algoStrategy=self.get_algo_strategy(),
+                        algoParams=self.get_algo_params(),
+                        tif="DAY",
+                        account=self.account_number,
+                    )
+
+                    return (ticker.contract, order)
+                except RuntimeError:
+                    log.error(
+                        "Error occurred when trying to close position. Continuing anyway..."
+                    )
+                    return None
+
+        results = await asyncio.gather(
+            *[close_position_task(position) for position in positions]
+        )
+
+        # Enqueue orders in the original position order
+        for contract_order in results:
+            if contract_order:
+                self.enqueue_order(*contract_order)
 
     async def roll_positions(
         self,
         positions: List[PortfolioItem],
         right: str,
         account_summary: Dict[str, AccountValue],
-        portfolio_positions: Optional[Dict[str, List[PortfolioItem]]] = None,
+        position_aggregates: Optional[Dict[str, PositionAggregates]] = None,
     ) -> List[PortfolioItem]:
         closeable_positions: List[PortfolioItem] = []
+        if not positions:
+            return closeable_positions
 
-        log.notice(f"Rolling {right} positions...")
-
-        for position in positions:
-            try:
-                symbol = position.contract.symbol
+        total_buying_power = self.get_buying_power(account_summary)
 
-                position.contract.exchange = self.get_order_exchange()
-                buy_ticker = await self.ibkr.get_ticker_for_contract(
-                    position.contract,
-                    required_fields=[],
-                    optional_fields=[TickerField.MIDPOINT, TickerField.MARKET_PRICE],
-                )
+        log.notice(f"Rolling {right} positions...")
 
-                strike_limit = self.config.get_strike_limit(symbol, right)
-                if right.startswith("C"):
-                    average_cost = (
-                        [
-                            p.averageCost
-                            for p in portfolio_positions[symbol]
-                            if isinstance(p.contract, Stock)
-                        ]
-                        if portfolio_positions and symbol in portfolio_positions
-                        else [0]
-                    )
-                    strike_limit = round(
-                        max([strike_limit or 0] + average_cost),
-                        2,
+        kind = "calls" if right.startswith("C") else "puts"
+        credit_only = getattr(self.roll_when, kind).credit_only
+        roll_when_dte = self.roll_when.dte
+        roll_when_max_dte = self.roll_when.max_dte
+        order_exchange = self.get_order_exchange()
+
+        # Each roll needs several IB round trips (the current option price, the
+        # chain scan and the replacement price), so roll positions concurrently,
+        # up to the configured limit. Returns the combo order to enqueue, and
+        # whether the position should be closed instead.
+        semaphore = asyncio.Semaphore(self.config.ib_async.max_concurrency)
+
+        async def roll_position_task(
+            position: PortfolioItem,
+        ) -> Tuple[Optional[Tuple[Contract, LimitOrder]], bool]:
+            async with semaphore:
+                try:
+                    symbol = position.contract.symbol
+                    primary_exchange = self.get_primary_exchange(symbol)
+
+                    position.contract.exchange = order_exchange
+                    buy_ticker = await self.ibkr.get_ticker_for_contract(
+                        position.contract,
+                        required_fields=[],
+                        optional_fields=[
+                            TickerField.MIDPOINT,
+                            TickerField.MARKET_PRICE,
+                        ],
                     )
-                    if self.config.maintain_high_water_mark(symbol):
-                        strike_limit = max([strike_limit, position.contract.strike])
-
-                elif right.startswith("P"):
-                    strike_limit = round(
-                        min(
-                            [strike_limit or sys.float_info.max]
-                            + [
+
+                    strike_limit = self.config.get_strike_limit(symbol, right)
+                    if right.startswith("C"):
+                        average_cost = (
+                            position_aggregates[symbol].max_stock_average_cost
+                            if position_aggregates and symbol in position_aggregates
+                            else 0
+                        )
+                        strike_limit = round(max(strike_limit or 0, average_cost), 2)
+                        if self.config.maintain_high_water_mark(symbol):
+                            strike_limit = max(strike_limit, position.contract.strike)
+
+                    elif right.startswith("P"):
+                        strike_limit = round(
+                            min(
+                                strike_limit or sys.float_info.max,
                                 max(
-                                    [
-                                        position.contract.strike,
-                                        position.contract.strike
-                                        + (
-                                            position.averageCost
-                                            / float(position.contract.multiplier)
-                                        )
-                                        - midpoint_or_market_price(buy_ticker),
-                                    ]
-                                )
-                            ]
-                        ),
-                        2,
+                                    position.contract.strike,
+                                    position.contract.strike
+                                    + (
+                                        position.averageCost
+                                        / float(position.contract.multiplier)
+                                    )
+                                    - midpoint_or_market_price(buy_ticker),
+                                ),
+                            ),
+                            2,
+                        )
+                        # special case: if we're rolling a put that's ITM, we want to roll to an equal or lower strike, not higher
+                        if isinstance(
+                            position.contract, Option
+                        ) and await self.put_is_itm(position.contract):
+                            strike_limit = min(strike_limit, position.contract.strike)
+
+                    minimum_price = (
+                        (lambda: self.config.orders.minimum_credit)
+                        if not credit_only
+                        else (
+                            lambda: midpoint_or_market_price(buy_ticker)
+                            + self.config.orders.minimum_credit
+                        )
                     )
-                    # special case: if we're rolling a put that's ITM, we want to roll to an equal or lower strike, not higher
-                    if isinstance(position.contract, Option) and await self.put_is_itm(
-                        position.contract
-                    ):
-                        strike_limit = min([strike_limit, position.contract.strike])
 
-                kind = "calls" if right.startswith("C") else "puts"
+                    def fallback_minimum_price() -> float:
+                        return midpoint_or_market_price(buy_ticker)
 
-                minimum_price = (
-                    (lambda: self.config.orders.minimum_credit)
-                    if not getattr(self.config.roll_when, kind).credit_only
-                    else (
-                        lambda: midpoint_or_market_price(buy_ticker)
-                        + self.config.orders.minimum_credit
+                    sell_ticker = await self.find_eligible_contracts(
+                        self.get_stock_contract(symbol, primary_exchange),
+                        right,
+                        strike_limit,
+                        exclude_expirations_before=position.contract.lastTradeDateOrContractMonth,
+                        exclude_exp_strike=(
+                            position.contract.strike,
+                            position.contract.lastTradeDateOrContractMonth,
+                        ),
+                        minimum_price=minimum_price,
+                        fallback_minimum_price=fallback_minimum_price,
                     )
-                )
-
-                def fallback_minimum_price() -> float:
-                    return midpoint_or_market_price(buy_ticker)
+                    if not sell_ticker.contract:
+                        raise RuntimeError(
+                            f"Invalid ticker (no contract): {sell_ticker}"
+                        )
 
-                sell_ticker = await self.find_eligible_contracts(
-                    Stock(
+                    qty_to_roll = int(abs(position.position))
+                    maximum_new_contracts = await self.get_maximum_new_contracts_for(
                         symbol,
-                        self.get_order_exchange(),
-                        "USD",
-                        primaryExchange=self.get_primary_exchange(symbol),
-                    ),
-                    right,
-                    strike_limit,
-                    exclude_expirations_before=position.contract.lastTradeDateOrContractMonth,
-                    exclude_exp_strike=(
-                        position.contract.strike,
-                        position.contract.lastTradeDateOrContractMonth,
-                    ),
-                    minimum_price=minimum_price,
-                    fallback_minimum_price=fallback_minimum_price,
-                )
-                if not sell_ticker.contract:
-                    raise RuntimeError(f"Invalid ticker (no contract): {sell_ticker}")
-
-                qty_to_roll = math.floor(abs(position.position))
-                maximum_new_contracts = await self.get_maximum_new_contracts_for(
-                    symbol,
-                    self.get_primary_exchange(symbol),
-                    account_summary,
-                )
-                from_dte = option_dte(position.contract.lastTradeDateOrContractMonth)
-                roll_when_dte = self.config.roll_when.dte
-                if from_dte > roll_when_dte:
-                    qty_to_roll = min([qty_to_roll, maximum_new_contracts])
-
-                price = midpoint_or_market_price(buy_ticker) - midpoint_or_market_price(
-                    sell_ticker
-                )
-                # a buy order should be at most the minimum price, when we expect a credit
-                price = (
-                    min([price, -self.config.orders.minimum_credit])
-                    if getattr(self.config.roll_when, kind).credit_only
-                    else price
-                )
+                        primary_exchange,
+                        total_buying_power,
+                    )
+                    from_dte = option_dte(
+                        position.contract.lastTradeDateOrContractMonth
+                    )
+                    if from_dte > roll_when_dte:
+                        qty_to_roll = min(qty_to_roll, maximum_new_contracts)
+
+                    price = midpoint_or_market_price(
+                        buy_ticker
+                    ) - midpoint_or_market_price(sell_ticker)
+                    # a buy order should be at most the minimum price, when we expect a credit
+                    price = (
+                        min(price, -self.config.orders.minimum_credit)
+                        if credit_only
+                        else price
+                    )
 
-                # store a copy of the contracts so we can retrieve them later by conId
-                self.qualified_contracts[position.contract.conId] = position.contract
-                self.qualified_contracts[sell_ticker.contract.conId] = (
-                    sell_ticker.contract
-                )
+                    # store a copy of the contracts so we can retrieve them later by conId
+                    self.qualified_contracts[position.contract.conId] = (
+                        position.contract
+                    )
+                    self.qualified_contracts[sell_ticker.contract.conId] = (
+                        sell_ticker.contract
+                    )
 
-                # Create combo legs
-                comboLegs = [
-                    ComboLeg(
-                        conId=position.contract.conId,
-                        ratio=1,
-                        exchange=self.get_order_exchange(),
-                        action="BUY",
-                    ),
-                    ComboLeg(
-                        conId=sell_ticker.contract.conId,
-                        ratio=1,
-                        exchange=self.get_order_exchange(),
-                        action="SELL",
-                    ),
-                ]
+                    # Create combo legs
+                    comboLegs = [
+                        ComboLeg(
+                            conId=position.contract.conId,
+                            ratio=1,
+                            exchange=order_exchange,
+                            action="BUY",
+                        ),
+                        ComboLeg(
+                            conId=sell_ticker.contract.conId,
+                            ratio=1,
+                            exchange=order_exchange,
+                            action="SELL",
+                        ),
+                    ]
 
-                # Create contract
-                combo = Contract(
-                    secType="BAG",
-                    symbol=symbol,
-                    currency="USD",
-                    exchange=self.get_order_exchange(),
-                    comboLegs=comboLegs,
-                )
+                    # Create contract
+                    combo = Contract(
+                        secType="BAG",
+                        symbol=symbol,
+                        currency="USD",
+                        exchange=order_exchange,
+                        comboLegs=comboLegs,
+                    )
 
-                # Create order
-                order = LimitOrder(
-                    "BUY",
-                    qty_to_roll,
-                    round(price, 2),
-                    algoStrategy=self.get_algo_strategy(),
-                    algoParams=self.get_algo_params(),
-                    tif="DAY",
-                    account=self.account_number,
-                )
+                    # Create order
+                    order = LimitOrder(
+                        "BUY",
+                        qty_to_roll,
+                        round(price, 2),
+                        algoStrategy=self.get_algo_strategy(),
+                        algoParams=self.get_algo_params(),
+                        tif="DAY",
+                        account=self.account_number,
+                    )
 
-                to_dte = option_dte(sell_ticker.contract.lastTradeDateOrContractMonth)
-                from_strike = position.contract.strike
-                to_strike = sell_ticker.contract.strike
-                log.info(
-                    f"{symbol}: Rolling from_strike={from_strike} to_strike={to_strike} from_dte={from_dte} to_dte={to_dte} price={dfmt(price, 3)} qty_to_roll={qty_to_roll}"
-                )
+                    to_dte = option_dte(
+                        sell_ticker.contract.lastTradeDateOrContractMonth
+                    )
+                    from_strike = position.contract.strike
+                    to_strike = sell_ticker.contract.strike
+                    log.info(
+                        f"{symbol}: Rolling from_strike={from_strike} to_strike={to_strike} from_dte={from_dte} to_dte={to_dte} price={dfmt(price, 3)} qty_to_roll={qty_to_roll}"
+                    )
 
-                # Enqueue order
-                self.enqueue_order(combo, order)
-            except NoValidContractsError:
-                dte = option_dte(position.contract.lastTradeDateOrContractMonth)
-                if (
-                    self.config.close_if_unable_to_roll(position.contract.symbol)
-                    and self.config.roll_when.max_dte
-                    and dte <= self.config.roll_when.max_dte
-                    and position_pnl(position) > 0
-                ):
-                    log.warning(
-                        f"{position.contract.symbol}: Unable to find a suitable contract to roll to for {position.contract.localSymbol}. Closing position instead..."
+                    return ((combo, order), False)
+                except NoValidContractsError:
+                    dte = option_dte(position.contract.lastTradeDateOrContractMonth)
+                    if (
+                        self.config.close_if_unable_to_roll(position.contract.symbol)
+                        and roll_when_max_dte
+                        and dte <= roll_when_max_dte
+                        and position_pnl(position) > 0
+                    ):
+                        log.warning(
+                            f"{position.contract.symbol}: Unable to find a suitable contract to roll to for {position.contract.localSymbol}. Closing position instead..."
+                        )
+                        return (None, True)
+                    log.error(
+                        f"{position.contract.symbol}: Error occurred when trying to roll position. Continuing anyway..."
                     )
-                    closeable_positions.append(position)
-                    continue
-                else:
+                    return (None, False)
+                except RuntimeError:
                     log.error(
                         f"{position.contract.symbol}: Error occurred when trying to roll position. Continuing anyway..."
                     )
-            except RuntimeError:
-                log.error(
-                    f"{position.contract.symbol}: Error occurred when trying to roll position. Continuing anyway..."
-                )
-                continue
+                    return (None, False)
+
+        results = await asyncio.gather(
+            *[roll_position_task(position) for position in positions]
+        )
+
+        # Enqueue orders in the original position order, regardless of which
+        # roll finished first
+        for position, (combo_order, closeable) in zip(positions, results):
+            if combo_order:
+                self.enqueue_order(*combo_order)
+            elif closeable:
+                closeable_positions.append(position)
 
         return closeable_positions
 
@@ -1505,7 +1677,16 @@ class PortfolioManager:
             "this can take a while...",
         )
 
-        underlying_ticker = await self.ibkr.get_ticker_for_contract(underlying)
+        if isinstance(underlying, Stock):
+            underlying_ticker = await self.get_ticker_for_stock(
+                underlying.symbol, underlying.primaryExchange
+            )
+            # The cached ticker's contract has already been qualified, which
+            # we need for the option chain lookup below
+            if isinstance(underlying_ticker.contract, Stock):
+                underlying = underlying_ticker.contract
+        else:
+            underlying_ticker = await self.ibkr.get_ticker_for_contract(underlying)
 
         underlying_price = midpoint_or_market_price(underlying_ticker)
 
@@ -1513,34 +1694,43 @@ class PortfolioManager:
 
         chain = next(c for c in chains if c.exchange == underlying.exchange)
 
-        def valid_strike(strike: float) -> bool:
-            if right.startswith("P") and strike_limit:
-                return strike <= strike_limit
-            elif right.startswith("P"):
-                return strike <= underlying_price + 0.05 * underlying_price
-            elif right.startswith("C") and strike_limit:
-                return strike >= strike_limit
-            elif right.startswith("C"):
-                return strike >= underlying_price - 0.05 * underlying_price
-            return False
+        # Filter the strikes with a single vectorized comparison, since chains
+        # for some underlyings have thousands of strikes
+        strike_values = np.fromiter(
+            chain.strikes, dtype=np.float64, count=len(chain.strikes)
+        )
+        if right.startswith("P"):
+            strike_mask = strike_values <= (
+                strike_limit
+                if strike_limit
+                else underlying_price + 0.05 * underlying_price
+            )
+        elif right.startswith("C"):
+            strike_mask = strike_values >= (
+                strike_limit
+                if strike_limit
+                else underlying_price - 0.05 * underlying_price
+            )
+        else:
+            strike_mask = np.zeros(len(strike_values), dtype=bool)
 
         chain_expirations = self.config.option_chains.expirations
         min_dte = (
             option_dte(exclude_expirations_before) if exclude_expirations_before else 0
         )
-        strikes = sorted(strike for strike in chain.strikes if valid_strike(strike))
+        strikes: List[float] = np.sort(strike_values[strike_mask]).tolist()
+        expiration_dtes = {exp: option_dte(exp) for exp in chain.expirations}
         expirations = sorted(
             exp
-            for exp in chain.expirations
-            if option_dte(exp) >= contract_target_dte
-            and option_dte(exp) >= min_dte
-            and (not contract_max_dte or option_dte(exp) <= contract_max_dte)
+            for exp, dte in expiration_dtes.items()
+            if dte >= contract_target_dte
+            and dte >= min_dte
+            and (not contract_max_dte or dte <= contract_max_dte)
         )[:chain_expirations]
         if len(expirations) < 1:
             raise NoValidContractsError(
                 f"No valid contract expirations found for {underlying.symbol}. Continuing anyway...",
             )
-        rights = [right]
 
         def nearest_strikes(strikes: List[float]) -> List[float]:
             chain_strikes = self.config.option_chains.strikes
@@ -1558,16 +1748,16 @@ class PortfolioManager:
             f" from expirations {expirations[0]} to {expirations[-1]}"
         )
 
+        order_exchange = self.get_order_exchange()
         contracts = [
             Option(
                 underlying.symbol,
                 expiration,
                 strike,
                 right,
-                self.get_order_exchange(),
+                order_exchange,
                 # tradingClass=chain.tradingClass,
             )
-            for right in rights
             for expiration in expirations
             for strike in strikes
         ]
@@ -1616,42 +1806,29 @@ class PortfolioManager:
                 and abs(ticker.modelGreeks.delta) <= contract_target_delta
             )
 
-        def price_is_valid(ticker: Ticker) -> bool:
-            def cost_doesnt_exceed_market_price(ticker: Ticker) -> bool:
-                # when writing puts, we need to be sure that the strike +
-                # credit is less than or equal to the current market price, so
-                # that we don't exceed the target capital allocation for this
-                # position
-                return (
-                    right.startswith("C")
-                    or isinstance(ticker.contract, Option)
-                    and ticker.contract.strike
-                    <= midpoint_or_market_price(ticker) + underlying_price
-                )
-
-            return midpoint_or_market_price(
-                ticker
-            ) > minimum_price() and cost_doesnt_exceed_market_price(ticker)
-
-        # Filter out invalid price
-        tickers = [
-            ticker
-            for ticker in log.track(
-                tickers,
-                description=f"{underlying.symbol}: Filtering invalid prices...",
-                total=len(tickers),
+        def price_is_valid(ticker: Ticker, minimum_price: float) -> bool:
+            price = midpoint_or_market_price(ticker)
+            # when writing puts, we need to be sure that the strike + credit is
+            # less than or equal to the current market price, so that we don't
+            # exceed the target capital allocation for this position
+            return price > minimum_price and (
+                right.startswith("C")
+                or isinstance(ticker.contract, Option)
+                and ticker.contract.strike <= price + underlying_price
             )
-            if price_is_valid(ticker)
-        ]
 
-        # Filter out invalid greeks
+        # Filter out invalid prices and greeks in one pass, keeping the tickers
+        # with a valid price but an invalid delta around as a fallback
         new_tickers = []
         delta_reject_tickers = []
+        min_price = minimum_price()
         for ticker in log.track(
             tickers,
-            description=f"{underlying.symbol}: Filtering invalid deltas...",
+            description=f"{underlying.symbol}: Filtering invalid prices and deltas...",
             total=len(tickers),
         ):
+            if not price_is_valid(ticker, min_price):
+                continue
             if delta_is_valid(ticker):
                 new_tickers.append(ticker)
             else:
@@ -1661,7 +1838,7 @@ class PortfolioManager:
         def filter_remaining_tickers(
             tickers: List[Ticker], delta_ord_desc: bool
         ) -> List[Ticker]:
-            minimum_open_interest = self.config.target.minimum_open_interest
+            minimum_open_interest = self.target.minimum_open_interest
 
             if minimum_open_interest > 0:
                 tickers = [
@@ -1674,25 +1851,24 @@ class PortfolioManager:
                     if open_interest_is_valid(ticker, minimum_open_interest)
                 ]
 
-            # Sort by delta first, then expiry date
-            tickers = sorted(
-                sorted(
-                    tickers,
-                    key=lambda t: (
-                        abs(t.modelGreeks.delta)
-                        if t.modelGreeks and t.modelGreeks.delta
-                        else 0
-                    ),
-                    reverse=delta_ord_desc,
-                ),
-                key=lambda t: (
+            # Sort by expiry date, then by delta (descending or ascending), in a
+            # single pass with a composite key
+            delta_sign = -1 if delta_ord_desc else 1
+
+            def sort_key(t: Ticker) -> Tuple[int, float]:
+                dte = (
                     option_dte(t.contract.lastTradeDateOrContractMonth)
                     if t.contract
                     else 0
-                ),
-            )
+                )
+                delta = (
+                    abs(t.modelGreeks.delta)
+                    if t.modelGreeks and t.modelGreeks.delta
+                    else 0
+                )
+                return (dte, delta_sign * delta)
 
-            return tickers
+            return sorted(tickers, key=sort_key)
 
         tickers = filter_remaining_tickers(list(tickers), True)
 
@@ -1749,8 +1925,6 @@ class PortfolioManager:
         return self.config.orders.algo.strategy
 
     def algo_params_from(self, params: List[List[str]]) -> List[TagValue]:
-        from ib_async import TagValue
-
         return [TagValue(p[0], p[1]) for p in params]
 
     def get_algo_params(self) -> List[TagValue]:
@@ -1775,8 +1949,7 @@ class PortfolioManager:
                 bool, Optional[Ticker], Optional[float]
             ]:
                 if self.config.vix_call_hedge.close_hedges_when_vix_exceeds:
-                    vix_contract = Index("VIX", "CBOE", "USD")
-                    vix_ticker = await self.ibkr.get_ticker_for_contract(vix_contract)
+                    vix_ticker = await self.ibkr.get_ticker_for_contract(self.vix_index)
                     close_hedges_when_vix_exceeds = (
                         self.config.vix_call_hedge.close_hedges_when_vix_exceeds
                     )
@@ -1852,38 +2025,38 @@ class PortfolioManager:
             # we never want to write calls if we're simultaneously ready to close calls
             if not close_vix_calls:
                 try:
-                    vixmo_contract = Index("VIXMO", "CBOE", "USD")
                     vixmo_ticker = await self.ibkr.get_ticker_for_contract(
-                        vixmo_contract
+                        self.vixmo_index
                     )
 
                     weight = 0.0
+                    vixmo_price = vixmo_ticker.marketPrice()
 
                     for allocation in self.config.vix_call_hedge.allocation:
                         if (
                             allocation.lower_bound
                             and allocation.upper_bound
                             and allocation.lower_bound
-                            <= vixmo_ticker.marketPrice()
+                            <= vixmo_price
                             < allocation.upper_bound
                         ):
                             weight = allocation.weight
                             break
                         elif (
                             allocation.lower_bound
-                            and allocation.lower_bound <= vixmo_ticker.marketPrice()
+                            and allocation.lower_bound <= vixmo_price
                         ):
                             weight = allocation.weight
                             break
                         elif (
                             allocation.upper_bound
-                            and vixmo_ticker.marketPrice() < allocation.upper_bound
+                            and vixmo_price < allocation.upper_bound
                         ):
                             weight = allocation.weight
                             break
 
                     log.info(
-                        f"VIX: VIXMO={vixmo_ticker.marketPrice():.2f}, target call hedge weight={weight}",
+                        f"VIX: VIXMO={vixmo_price:.2f}, target call hedge weight={weight}",
                     )
 
                     allocation_amount = (
@@ -1906,9 +2079,8 @@ class PortfolioManager:
                     log.info(
                         "VIX: Scanning option chain for eligible contracts...",
                     )
-                    vix_contract = Index("VIX", "CBOE", "USD")
                     buy_ticker = await self.find_eligible_contracts(
-                        vix_contract,
+                        self.vix_index,
                         "C",
                         0,
                         target_delta=delta,
@@ -2042,13 +2214,15 @@ class PortfolioManager:
                                 f" price={price}, but we have no position to sell"
                             )
                             return (None, None)
-                        positions = [
-                            p.position
-                            for p in portfolio_positions[symbol]
-                            if isinstance(p.contract, Stock)
-                        ]
-                        position = positions[0] if len(positions) > 0 else 0
-                        qty = min([max([-math.floor(position), qty]), 0])
+                        position = next(
+                            (
+                                p.position
+                                for p in portfolio_positions[symbol]
+                                if isinstance(p.contract, Stock)
+                            ),
+                            0,
+                        )
+                        qty = min(max(-math.floor(position), qty), 0)
                         # if for some reason the qty is zero, do nothing
                         if qty == 0:
                             log.warning(
@@ -2102,15 +2276,12 @@ class PortfolioManager:
         self.trades.print_summary()
 
     async def adjust_prices(self) -> None:
-        if (
-            all(
-                [
-                    not self.config.symbols[symbol].adjust_price_after_delay
-                    for symbol in self.config.symbols
-                ]
-            )
-            or self.trades.is_empty()
-        ):
+        adjust_price_symbols = {
+            symbol
+            for symbol, symbol_config in self.config.symbols.items()
+            if symbol_config.adjust_price_after_delay
+        }
+        if not adjust_price_symbols or self.trades.is_empty():
             log.warning("Skipping order price adjustments...")
             return
 
@@ -2125,73 +2296,78 @@ class PortfolioManager:
             (idx, trade)
             for idx, trade in enumerate(self.trades.records())
             if trade
-            and trade.contract.symbol in self.config.symbols
-            and self.config.symbols[trade.contract.symbol].adjust_price_after_delay
+            and trade.contract.symbol in adjust_price_symbols
             and not trade.isDone()
         ]
 
-        for idx, trade in unfilled:
-            try:
-                ticker = await self.ibkr.get_ticker_for_contract(
-                    trade.contract,
-                    required_fields=[TickerField.MIDPOINT],
-                    optional_fields=[TickerField.MARKET_PRICE],
-                )
+        # Each adjustment needs a fresh midpoint for the contract, so fetch them
+        # concurrently, up to the configured limit
+        semaphore = asyncio.Semaphore(self.config.ib_async.max_concurrency)
+
+        async def adjust_price_task(idx: int, trade: Trade) -> None:
+            async with semaphore:
+                try:
+                    ticker = await self.ibkr.get_ticker_for_contract(
+                        trade.contract,
+                        required_fields=[TickerField.MIDPOINT],
+                        optional_fields=[TickerField.MARKET_PRICE],
+                    )
 
-                (contract, order) = (trade.contract, trade.order)
-                updated_price = np.sign(order.lmtPrice) * max(
-                    [
+                    (contract, order) = (trade.contract, trade.order)
+                    updated_price = np.sign(order.lmtPrice) * max(
                         (
                             self.config.orders.minimum_credit
                             if order.action == "BUY" and order.lmtPrice <= 0.0
                             else 0.0
                         ),
                         math.fabs(round((order.lmtPrice + ticker.midpoint()) / 2.0, 2)),
-                    ]
-                )
-
-                # We only want to tighten spreads, not widen them. If the
-                # resulting price change would increase the spread, we'll
-                # skip it.
-                if would_increase_spread(order, updated_price):
-                    log.warning(
-                        f"Skipping order for {contract.symbol}"
-                        f" with old lmtPrice={dfmt(order.lmtPrice)} updated lmtPrice={dfmt(updated_price)}, because updated price would increase spread"
                     )
-                    return
 
-                # Check if the updated price is actually any different
-                # before proceeding, and make sure the signs match so we
-                # don't switch a credit to a debit or vice versa.
-                if order.lmtPrice != updated_price and np.sign(
-                    order.lmtPrice
-                ) == np.sign(updated_price):
-                    log.info(
-                        f"{contract.symbol}: Resubmitting {order.action} {contract.secType} order with old lmtPrice={dfmt(order.lmtPrice)} updated lmtPrice={dfmt(updated_price)}"
-                    )
+                    # We only want to tighten spreads, not widen them. If the
+                    # resulting price change would increase the spread, we'll
+                    # skip it.
+                    if would_increase_spread(order, updated_price):
+                        log.warning(
+                            f"Skipping order for {contract.symbol}"
+                            f" with old lmtPrice={dfmt(order.lmtPrice)} updated lmtPrice={dfmt(updated_price)}, because updated price would increase spread"
+                        )
+                        return
 
-                    # For some reason, we need to create a new order object
-                    # and populate the fields rather than modifying the
-                    # existing order in-place (janky).
-                    order = LimitOrder(
-                        order.action,
-                        order.totalQuantity,
-                        float(updated_price),
-                        orderId=order.orderId,
-                        algoStrategy=order.algoStrategy,
-                        algoParams=order.algoParams,
-                    )
+                    # Check if the updated price is actually any different
+                    # before proceeding, and make sure the signs match so we
+                    # don't switch a credit to a debit or vice versa.
+                    if order.lmtPrice != updated_price and np.sign(
+                        order.lmtPrice
+                    ) == np.sign(updated_price):
+                        log.info(
+                            f"{contract.symbol}: Resubmitting {order.action} {contract.secType} order with old lmtPrice={dfmt(order.lmtPrice)} updated lmtPrice={dfmt(updated_price)}"
+                        )
 
-                    # resubmit the order and it will be placed back to the
-                    # original position in the queue
-                    self.trades.submit_order(contract, order, idx)
+                        # For some reason, we need to create a new order object
+                        # and populate the fields rather than modifying the
+                        # existing order in-place (janky).
+                        order = LimitOrder(
+                            order.action,
+                            order.totalQuantity,
+                            float(updated_price),
+                            orderId=order.orderId,
+                            algoStrategy=order.algoStrategy,
+                            algoParams=order.algoParams,
+                        )
 
-                    log.info(f"{contract.symbol}: Order updated, order={order}")
-            except (RuntimeError, RequiredFieldValidationError):
-                log.error(
-                    f"Couldn't generate midpoint price for {trade.contract}, skipping"
-                )
-                continue
+                        # resubmit the order and it will be placed back to the
+                        # original position in the queue
+                        self.trades.submit_order(contract, order, idx)
+
+                        log.info(f"{contract.symbol}: Order updated, order={order}")
+                except (RuntimeError, RequiredFieldValidationError):
+                    log.error(
+                        f"Couldn't generate midpoint price for {trade.contract}, skipping"
+                    )
+
+        await asyncio.gather(
+            *[adjust_price_task(idx, trade) for idx, trade in unfilled]
+        )
 
     async def get_write_threshold(
         self, ticker: Ticker, right: str
@@ -2204,11 +2380,16 @@ class PortfolioManager:
             right,
         )
         if threshold_sigma:
-            hist_prices = await self.ibkr.request_historical_data(
-                ticker.contract, self.config.constants.daily_stddev_window
-            )
-            log_prices = np.log(np.array([p.close for p in hist_prices]))
-            stddev = np.std(np.diff(log_prices), ddof=1)
+            # The daily volatility is the same whether we're writing puts or
+            # calls, so only request the price history once per symbol each run
+            stddev = self.daily_stddevs.get(ticker.contract.symbol)
+            if stddev is None:
+                hist_prices = await self.ibkr.request_historical_data(
+                    ticker.contract, self.config.constants.daily_stddev_window
+                )
+                log_prices = np.log(np.array([p.close for p in hist_prices]))
+                stddev = float(np.std(np.diff(log_prices), ddof=1))
+                self.daily_stddevs[ticker.contract.symbol] = stddev
 
             return (
                 ticker.close * (np.exp(stddev) - 1).astype(float) * threshold_sigma,
@@ -0,0 +1,38 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from ib_async import Option, Stock
+
+from thetagang.ibkr import IBKR
+
+
+def make_ibkr() -> IBKR:
+    ib = MagicMock()
+    ib.qualifyContractsAsync = AsyncMock()
+    return IBKR(ib, api_response_wait_time=1, default_order_exchange="SMART")
+
+
+def test_market_data_handler_qualifies_unqualified_contract() -> None:
+    ibkr = make_ibkr()
+    stock = Stock("SPY", "SMART", "USD")
+
+    asyncio.run(
+        ibkr.__market_data_streaming_handler__(stock, "", AsyncMock(return_value=None))
+    )
+
+    ibkr.ib.qualifyContractsAsync.assert_awaited_once_with(stock)
+    ibkr.ib.reqMktData.assert_called_once_with(stock, genericTickList="")
+
+
+def test_market_data_handler_skips_qualified_contract() -> None:
+    ibkr = make_ibkr()
+    option = Option("SPY", "20250117", 500.0, "P", "SMART", conId=1234)
+
+    asyncio.run(
+        ibkr.__market_data_streaming_handler__(
+            option, "101", AsyncMock(return_value=None)
+        )
+    )
+
+    ibkr.ib.qualifyContractsAsync.assert_not_awaited()
+    ibkr.ib.reqMktData.assert_called_once_with(option, genericTickList="101")
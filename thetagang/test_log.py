@@ -0,0 +1,52 @@
+import asyncio
+
+from thetagang import log
+
+
+async def sleep_and_return(value: int) -> int:
+    await asyncio.sleep(0)
+    return value
+
+
+def test_track_async_concurrent_trackers_share_progress() -> None:
+    async def run() -> list[list[int]]:
+        return list(
+            await asyncio.gather(
+                log.track_async([sleep_and_return(i) for i in range(3)], "first"),
+                log.track_async([sleep_and_return(i) for i in range(2)], "second"),
+            )
+        )
+
+    first, second = asyncio.run(run())
+    assert sorted(first) == [0, 1, 2]
+    assert sorted(second) == [0, 1]
+    assert log.shared_progress is None
+    assert log.shared_progress_users == 0
+
+
+def test_track_nested_in_track_async() -> None:
+    async def nested(value: int) -> int:
+        return sum(log.track(range(value), "inner", total=value))
+
+    results = asyncio.run(log.track_async([nested(3), nested(4)], "outer"))
+    assert sorted(results) == [3, 6]
+    assert log.shared_progress is None
+
+
+def test_track_async_max_concurrency() -> None:
+    running = 0
+    peak = 0
+
+    async def task(value: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return value
+
+    results = asyncio.run(
+        log.track_async([task(i) for i in range(6)], "limited", max_concurrency=2)
+    )
+    assert sorted(results) == list(range(6))
+    assert peak == 2
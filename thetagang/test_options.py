@@ -0,0 +1,15 @@
+from datetime import date, datetime, timedelta
+
+from thetagang.options import contract_date_to_datetime, option_dte
+
+
+def test_contract_date_to_datetime() -> None:
+    assert contract_date_to_datetime("20220121") == datetime(2022, 1, 21)
+    assert contract_date_to_datetime("202201") == datetime(2022, 1, 1)
+
+
+def test_option_dte() -> None:
+    expiration = (date.today() + timedelta(days=7)).strftime("%Y%m%d")
+    assert option_dte(expiration) == 7
+    # Cached parse must not freeze the DTE calculation
+    assert option_dte(expiration) == 7
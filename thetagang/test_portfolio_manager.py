@@ -0,0 +1,369 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+from ib_async import AccountValue, Option, PortfolioItem, Ticker
+from ib_async.contract import Contract, Index
+
+from thetagang.config import (
+    IBAsyncConfig,
+    OrdersConfig,
+    RollWhenConfig,
+    SymbolConfig,
+)
+from thetagang.fmt import dfmt, ifmt
+from thetagang.ibkr import RequiredFieldValidationError
+from thetagang.portfolio_manager import NoValidContractsError, PortfolioManager
+from thetagang.test_config import ConfigFactory, SymbolConfigFactory
+from thetagang.util import PositionAggregates
+
+
+def make_portfolio_manager(
+    symbols: Optional[Dict[str, SymbolConfig]] = None, **kwargs: Any
+) -> PortfolioManager:
+    config = ConfigFactory.build(
+        symbols=symbols
+        or {
+            "SPY": SymbolConfigFactory.build(
+                weight=1.0, primary_exchange="ARCA", no_trading=False
+            )
+        },
+        **kwargs,
+    )
+    portfolio_manager = PortfolioManager(config, MagicMock(), MagicMock(), True)
+    portfolio_manager.ibkr = MagicMock()
+    return portfolio_manager
+
+
+def make_ticker(market_price: float, contract: Optional[Contract] = None) -> Ticker:
+    ticker = MagicMock(spec=Ticker)
+    ticker.marketPrice.return_value = market_price
+    ticker.midpoint.return_value = market_price
+    ticker.modelGreeks = None
+    ticker.minTick = 0.01
+    ticker.contract = contract
+    return ticker
+
+
+def make_option(
+    symbol: str, strike: float, right: str, expiration: str = "20250117", conId: int = 0
+) -> Option:
+    return Option(
+        symbol,
+        expiration,
+        strike,
+        right,
+        "SMART",
+        primaryExchange="ARCA",
+        conId=conId,
+    )
+
+
+def test_option_is_itm_for_stock_put_and_call() -> None:
+    portfolio_manager = make_portfolio_manager()
+    portfolio_manager.ibkr.get_ticker_for_stock = AsyncMock(
+        return_value=make_ticker(100.0)
+    )
+
+    async def check() -> None:
+        assert await portfolio_manager.put_is_itm(make_option("SPY", 105.0, "P"))
+        assert not await portfolio_manager.put_is_itm(make_option("SPY", 95.0, "P"))
+        assert await portfolio_manager.call_is_itm(make_option("SPY", 95.0, "C"))
+        assert not await portfolio_manager.call_is_itm(make_option("SPY", 105.0, "C"))
+
+    asyncio.run(check())
+
+    # The underlying is cached after the first check
+    portfolio_manager.ibkr.get_ticker_for_stock.assert_awaited_once_with("SPY", "ARCA")
+
+
+def test_option_is_itm_for_vix_put_uses_the_index() -> None:
+    portfolio_manager = make_portfolio_manager()
+    portfolio_manager.ibkr.get_ticker_for_stock = AsyncMock()
+    portfolio_manager.ibkr.get_ticker_for_contract = AsyncMock(
+        return_value=make_ticker(20.0)
+    )
+
+    async def check() -> None:
+        assert await portfolio_manager.put_is_itm(make_option("VIX", 25.0, "P"))
+        assert not await portfolio_manager.put_is_itm(make_option("VIX", 15.0, "P"))
+
+    asyncio.run(check())
+
+    portfolio_manager.ibkr.get_ticker_for_stock.assert_not_awaited()
+    for call in portfolio_manager.ibkr.get_ticker_for_contract.await_args_list:
+        contract = call.args[0]
+        assert isinstance(contract, Index)
+        assert contract.symbol == "VIX"
+
+
+def test_check_if_can_write_puts_skips_unheld_zero_weight_symbol() -> None:
+    portfolio_manager = make_portfolio_manager(
+        {
+            "SPY": SymbolConfigFactory.build(
+                weight=1.0, primary_exchange="ARCA", no_trading=False
+            ),
+            "QQQ": SymbolConfigFactory.build(
+                weight=0.0, primary_exchange="NASDAQ", no_trading=False
+            ),
+        }
+    )
+    portfolio_manager.ibkr.qualify_contracts = AsyncMock()
+    portfolio_manager.ibkr.get_ticker_for_contract = AsyncMock(
+        return_value=make_ticker(100.0)
+    )
+    account_summary = {
+        "NetLiquidation": AccountValue("DU1234", "NetLiquidation", "0", "USD", "")
+    }
+
+    (positions_table, put_actions_table, to_write) = asyncio.run(
+        portfolio_manager.check_if_can_write_puts(account_summary, {}, {})
+    )
+
+    # Only the weighted symbol needs market data
+    requested = [
+        call.args[0].symbol
+        for call in portfolio_manager.ibkr.get_ticker_for_contract.await_args_list
+    ]
+    assert requested == ["SPY"]
+    assert portfolio_manager.target_quantities["QQQ"] == 0
+
+    # The symbol still gets a summary row, with nothing to write
+    rows = list(zip(*(column.cells for column in positions_table.columns)))
+    (qqq_row,) = [row for row in rows if row[0] == "QQQ"]
+    assert qqq_row[1] == ifmt(0)
+    assert qqq_row[-4:] == (dfmt(0.0), ifmt(0), ifmt(0), ifmt(0))
+    assert "QQQ" not in list(put_actions_table.columns[0].cells)
+    assert to_write == []
+
+
+def make_short_calls(symbols: List[str]) -> List[PortfolioItem]:
+    expiration = (date.today() + timedelta(days=10)).strftime("%Y%m%d")
+    return [
+        PortfolioItem(
+            contract=make_option(symbol, 100.0, "C", expiration, conId=conId),
+            position=-1.0,
+            marketPrice=1.0,
+            marketValue=-100.0,
+            averageCost=200.0,
+            unrealizedPNL=100.0,
+            realizedPNL=0.0,
+            account="DU1234",
+        )
+        for conId, symbol in enumerate(symbols, start=1)
+    ]
+
+
+def make_rolling_portfolio_manager(symbols: List[str]) -> PortfolioManager:
+    return make_portfolio_manager(
+        {
+            symbol: SymbolConfigFactory.build(
+                weight=1.0 / len(symbols),
+                primary_exchange="ARCA",
+                no_trading=False,
+                close_if_unable_to_roll=None,
+                calls=None,
+                puts=None,
+            )
+            for symbol in symbols
+        },
+        roll_when=RollWhenConfig(dte=0, max_dte=30, close_if_unable_to_roll=True),
+        orders=OrdersConfig(),
+        ib_async=IBAsyncConfig(max_concurrency=4),
+    )
+
+
+# Later symbols finish first, so completion order is the reverse of position
+# order
+DELAYS = {"AAA": 0.03, "BBB": 0.02, "CCC": 0.01, "DDD": 0.0}
+
+
+def test_roll_positions_enqueues_in_position_order() -> None:
+    symbols = ["AAA", "BBB", "CCC", "DDD"]
+    portfolio_manager = make_rolling_portfolio_manager(symbols)
+    portfolio_manager.ibkr.get_ticker_for_contract = AsyncMock(
+        return_value=make_ticker(1.0)
+    )
+    portfolio_manager.get_maximum_new_contracts_for = AsyncMock(return_value=10)
+    strike_limits: Dict[str, Optional[float]] = {}
+
+    async def find_eligible_contracts(
+        underlying: Contract, right: str, strike_limit: Optional[float], **kwargs: Any
+    ) -> Ticker:
+        strike_limits[underlying.symbol] = strike_limit
+        await asyncio.sleep(DELAYS[underlying.symbol])
+        if underlying.symbol == "BBB":
+            raise NoValidContractsError("no contracts")
+        expiration = (date.today() + timedelta(days=40)).strftime("%Y%m%d")
+        return make_ticker(
+            0.5, make_option(underlying.symbol, 105.0, right, expiration, conId=100)
+        )
+
+    portfolio_manager.find_eligible_contracts = find_eligible_contracts  # type: ignore
+    positions = make_short_calls(symbols)
+    account_summary = {
+        "NetLiquidation": AccountValue("DU1234", "NetLiquidation", "0", "USD", "")
+    }
+
+    position_aggregates = {
+        "AAA": PositionAggregates(stock_count=100, max_stock_average_cost=123.45)
+    }
+
+    closeable = asyncio.run(
+        portfolio_manager.roll_calls(positions, account_summary, position_aggregates)
+    )
+
+    # The position with nothing to roll to is handed back to be closed
+    assert closeable == [positions[1]]
+    records = portfolio_manager.orders.records()
+    assert [contract.symbol for contract, _ in records] == ["AAA", "CCC", "DDD"]
+
+    # Calls aren't rolled below the stock's average cost, and there's no
+    # floor without stock or a configured strike limit
+    assert strike_limits["AAA"] == 123.45
+    assert strike_limits["CCC"] == 0.0
+
+
+def test_close_positions_enqueues_in_position_order() -> None:
+    symbols = ["AAA", "BBB", "CCC", "DDD"]
+    portfolio_manager = make_rolling_portfolio_manager(symbols)
+
+    async def get_ticker_for_contract(contract: Contract, **kwargs: Any) -> Ticker:
+        await asyncio.sleep(DELAYS[contract.symbol])
+        return make_ticker(1.0, contract)
+
+    portfolio_manager.ibkr.get_ticker_for_contract = get_ticker_for_contract
+    positions = make_short_calls(symbols)
+
+    asyncio.run(portfolio_manager.close_calls(positions))
+
+    records = portfolio_manager.orders.records()
+    assert [contract.symbol for contract, _ in records] == symbols
+    assert all(order.action == "BUY" for _, order in records)
+
+
+def test_roll_and_close_positions_skip_empty_lists() -> None:
+    portfolio_manager = make_rolling_portfolio_manager(["AAA"])
+    portfolio_manager.ibkr.get_ticker_for_contract = AsyncMock()
+
+    async def check() -> None:
+        assert await portfolio_manager.roll_puts([], {}) == []
+        await portfolio_manager.close_puts([])
+
+    asyncio.run(check())
+
+    portfolio_manager.ibkr.get_ticker_for_contract.assert_not_awaited()
+    assert portfolio_manager.orders.records() == []
+
+
+def test_check_calls_skips_underlying_tickers_when_itm_is_not_checked() -> None:
+    portfolio_manager = make_portfolio_manager(
+        roll_when=RollWhenConfig(
+            dte=0, calls=RollWhenConfig.Calls(itm=True, always_when_itm=False)
+        ),
+    )
+    portfolio_manager.ibkr.qualify_contracts = AsyncMock()
+    portfolio_manager.ibkr.get_ticker_for_contract = AsyncMock()
+    portfolio_manager.ibkr.get_ticker_for_stock = AsyncMock()
+    calls = make_short_calls(["SPY"])
+
+    asyncio.run(portfolio_manager.check_calls({"SPY": calls}))
+
+    portfolio_manager.ibkr.qualify_contracts.assert_not_awaited()
+    portfolio_manager.ibkr.get_ticker_for_contract.assert_not_awaited()
+    portfolio_manager.ibkr.get_ticker_for_stock.assert_not_awaited()
+
+
+def test_get_ticker_for_stock_shares_in_flight_requests() -> None:
+    portfolio_manager = make_portfolio_manager()
+    ticker = make_ticker(100.0)
+    release = asyncio.Event()
+
+    async def get_ticker_for_stock(symbol: str, primary_exchange: str) -> Ticker:
+        await release.wait()
+        return ticker
+
+    portfolio_manager.ibkr.get_ticker_for_stock = AsyncMock(
+        side_effect=get_ticker_for_stock
+    )
+
+    async def check() -> None:
+        waiters = [
+            asyncio.ensure_future(portfolio_manager.get_ticker_for_stock("SPY", "ARCA"))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == [ticker, ticker]
+
+    asyncio.run(check())
+
+    portfolio_manager.ibkr.get_ticker_for_stock.assert_awaited_once_with("SPY", "ARCA")
+    assert portfolio_manager.stock_tickers == {("SPY", "ARCA"): ticker}
+    assert portfolio_manager.stock_ticker_requests == {}
+
+
+def test_get_ticker_for_stock_failure_reaches_every_waiter() -> None:
+    portfolio_manager = make_portfolio_manager()
+    release = asyncio.Event()
+
+    async def get_ticker_for_stock(symbol: str, primary_exchange: str) -> Ticker:
+        await release.wait()
+        raise RequiredFieldValidationError("no market price")
+
+    portfolio_manager.ibkr.get_ticker_for_stock = AsyncMock(
+        side_effect=get_ticker_for_stock
+    )
+
+    async def check() -> None:
+        waiters = [
+            asyncio.ensure_future(portfolio_manager.get_ticker_for_stock("SPY", "ARCA"))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, RequiredFieldValidationError) for r in results)
+
+    asyncio.run(check())
+
+    assert portfolio_manager.ibkr.get_ticker_for_stock.await_count == 1
+    assert portfolio_manager.stock_tickers == {}
+    assert portfolio_manager.stock_ticker_requests == {}
+
+
+def test_get_ticker_for_stock_cancelled_waiter_keeps_the_request() -> None:
+    portfolio_manager = make_portfolio_manager()
+    ticker = make_ticker(100.0)
+    release = asyncio.Event()
+
+    async def get_ticker_for_stock(symbol: str, primary_exchange: str) -> Ticker:
+        await release.wait()
+        return ticker
+
+    portfolio_manager.ibkr.get_ticker_for_stock = AsyncMock(
+        side_effect=get_ticker_for_stock
+    )
+
+    async def check() -> None:
+        cancelled = asyncio.ensure_future(
+            portfolio_manager.get_ticker_for_stock("SPY", "ARCA")
+        )
+        waiter = asyncio.ensure_future(
+            portfolio_manager.get_ticker_for_stock("SPY", "ARCA")
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert cancelled.cancelled()
+        assert ("SPY", "ARCA") in portfolio_manager.stock_ticker_requests
+
+        release.set()
+        assert await waiter is ticker
+
+    asyncio.run(check())
+
+    assert portfolio_manager.ibkr.get_ticker_for_stock.await_count == 1
+    assert portfolio_manager.stock_tickers == {("SPY", "ARCA"): ticker}
+    assert portfolio_manager.stock_ticker_requests == {}
@@ -13,7 +13,9 @@ from thetagang.test_config import (
     TargetConfigPutsFactory,
 )
 from thetagang.util import (
+    aggregate_positions,
     calculate_net_short_positions,
+    net_option_positions,
     position_pnl,
     weighted_avg_long_strike,
     weighted_avg_short_strike,
@@ -547,6 +549,80 @@ def test_weighted_avg_strike() -> None:
     )
 
 
+def test_aggregate_positions() -> None:
+    today = date.today()
+    exp3dte = (today + timedelta(days=3)).strftime("%Y%m%d")
+    spy = PortfolioItem(
+        contract=Stock(
+            conId=756733,
+            symbol="SPY",
+            right="0",
+            primaryExchange="ARCA",
+            currency="USD",
+            localSymbol="SPY",
+            tradingClass="SPY",
+        ),
+        position=250.0,
+        marketPrice=365.4960022,
+        marketValue=91374.0,
+        averageCost=368.42,
+        unrealizedPNL=-731.0,
+        realizedPNL=0.0,
+        account="DU2962946",
+    )
+
+    aggregates = aggregate_positions(
+        {
+            "SPY": [
+                spy,
+                con(exp3dte, 370, "C", -2),
+                con(exp3dte, 380, "C", 1),
+                con(exp3dte, 350, "P", -3),
+                con(exp3dte, 340, "P", 1),
+            ]
+        }
+    )
+    assert aggregates["SPY"].stock_count == 250
+    assert math.isclose(aggregates["SPY"].max_stock_average_cost, 368.42)
+    assert aggregates["SPY"].short_call_count == 2
+    assert aggregates["SPY"].short_put_count == 3
+    assert aggregates["SPY"].long_call_count == 1
+    assert aggregates["SPY"].long_put_count == 1
+    assert aggregates["SPY"].short_call_avg_strike == 370
+    assert aggregates["SPY"].long_put_avg_strike == 340
+
+    aggregates = aggregate_positions({"SPY": [con(exp3dte, 350, "P", -1)]})
+    assert aggregates["SPY"].stock_count == 0
+    assert aggregates["SPY"].max_stock_average_cost == 0.0
+    assert aggregates["SPY"].short_call_count == 0
+    assert aggregates["SPY"].short_put_count == 1
+    assert aggregates["SPY"].long_put_count == 0
+    assert aggregates["SPY"].short_put_avg_strike == 350
+    assert aggregates["SPY"].short_call_avg_strike is None
+
+
+def test_net_option_positions() -> None:
+    today = date.today()
+    exp3dte = (today + timedelta(days=3)).strftime("%Y%m%d")
+    exp30dte = (today + timedelta(days=30)).strftime("%Y%m%d")
+    expired = (today - timedelta(days=1)).strftime("%Y%m%d")
+    positions = {
+        "VIX": [
+            con(exp3dte, 20, "C", 2),
+            con(exp30dte, 25, "C", 3),
+            con(expired, 20, "C", 5),
+            con(exp30dte, 15, "P", 7),
+        ]
+    }
+
+    assert net_option_positions("VIX", positions, "C") == 5
+    assert net_option_positions("VIX", positions, "c") == 5
+    assert net_option_positions("VIX", positions, "C", ignore_dte=3) == 3
+    assert net_option_positions("VIX", positions, "C", ignore_dte=-5) == 5
+    assert net_option_positions("VIX", positions, "P") == 7
+    assert net_option_positions("SPY", positions, "C") == 0
+
+
 def test_would_increase_spread() -> None:
     # Test BUY order with lmtPrice < 0 and updated_price > lmtPrice
     order1 = Order(action="BUY", lmtPrice=-10)
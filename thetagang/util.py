@@ -1,11 +1,13 @@
 import math
+from collections import defaultdict
+from dataclasses import dataclass
 from operator import itemgetter
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import ib_async.objects
 import ib_async.ticker
 from ib_async import AccountValue, Order, PortfolioItem, Ticker, util
-from ib_async.contract import Option
+from ib_async.contract import Option, Stock
 
 from thetagang.config import Config
 from thetagang.options import option_dte
@@ -32,6 +34,65 @@ def portfolio_positions_to_dict(
     return d
 
 
+@dataclass
+class PositionAggregates:
+    stock_count: int = 0
+    max_stock_average_cost: float = 0.0
+    short_call_count: int = 0
+    short_put_count: int = 0
+    long_call_count: int = 0
+    long_put_count: int = 0
+    short_call_avg_strike: Optional[float] = None
+    short_put_avg_strike: Optional[float] = None
+    long_call_avg_strike: Optional[float] = None
+    long_put_avg_strike: Optional[float] = None
+
+
+def aggregate_positions(
+    portfolio_positions: Dict[str, List[PortfolioItem]],
+) -> Dict[str, PositionAggregates]:
+    # Walk each symbol's positions once, rather than re-scanning the same
+    # list for every value we need
+    d: Dict[str, PositionAggregates] = dict()
+    for symbol, positions in portfolio_positions.items():
+        stock_count = 0.0
+        max_stock_average_cost = 0.0
+        # Option quantities and quantity-weighted strike sums, keyed by
+        # (right, is_short)
+        quantities: Dict[Tuple[str, bool], float] = defaultdict(float)
+        strike_sums: Dict[Tuple[str, bool], float] = defaultdict(float)
+        for p in positions:
+            if isinstance(p.contract, Stock):
+                stock_count += p.position
+                max_stock_average_cost = max(
+                    max_stock_average_cost, p.averageCost or 0.0
+                )
+            elif isinstance(p.contract, Option) and p.position != 0:
+                key = (p.contract.right.upper()[:1], p.position < 0)
+                quantity = abs(p.position)
+                quantities[key] += quantity
+                strike_sums[key] += quantity * p.contract.strike
+
+        def avg_strike(key: Tuple[str, bool]) -> Optional[float]:
+            if quantities[key] > 0:
+                return strike_sums[key] / quantities[key]
+            return None
+
+        d[symbol] = PositionAggregates(
+            stock_count=math.floor(stock_count),
+            max_stock_average_cost=max_stock_average_cost,
+            short_call_count=int(quantities[("C", True)]),
+            short_put_count=int(quantities[("P", True)]),
+            long_call_count=int(quantities[("C", False)]),
+            long_put_count=int(quantities[("P", False)]),
+            short_call_avg_strike=avg_strike(("C", True)),
+            short_put_avg_strike=avg_strike(("P", True)),
+            long_call_avg_strike=avg_strike(("C", False)),
+            long_put_avg_strike=avg_strike(("P", False)),
+        )
+    return d
+
+
 def position_pnl(position: ib_async.objects.PortfolioItem) -> float:
     return position.unrealizedPNL / abs(position.averageCost * position.position)
 
@@ -39,40 +100,42 @@ def position_pnl(position: ib_async.objects.PortfolioItem) -> float:
 def get_short_positions(
     positions: List[PortfolioItem], right: str
 ) -> List[PortfolioItem]:
+    right = right.upper()
     return [
         p
         for p in positions
-        if isinstance(p.contract, Option)
-        and p.contract.right.upper().startswith(right.upper())
-        and p.position < 0
+        if p.position < 0
+        and isinstance(p.contract, Option)
+        and p.contract.right.upper().startswith(right)
     ]
 
 
 def get_long_positions(
     positions: List[PortfolioItem], right: str
 ) -> List[PortfolioItem]:
+    right = right.upper()
     return [
         p
         for p in positions
-        if isinstance(p.contract, Option)
-        and p.contract.right.upper().startswith(right.upper())
-        and p.position > 0
+        if p.position > 0
+        and isinstance(p.contract, Option)
+        and p.contract.right.upper().startswith(right)
     ]
 
 
 def count_short_option_positions(positions: List[PortfolioItem], right: str) -> int:
-    return math.floor(-sum([p.position for p in get_short_positions(positions, right)]))
+    return int(-sum(p.position for p in get_short_positions(positions, right)))
 
 
 def weighted_avg_short_strike(
     positions: List[PortfolioItem], right: str
 ) -> Optional[float]:
-    shorts = [
-        (abs(p.position), p.contract.strike)
-        for p in get_short_positions(positions, right)
-    ]
-    num = sum([p[0] * p[1] for p in shorts])
-    den = sum([p[0] for p in shorts])
+    num = 0.0
+    den = 0.0
+    for p in get_short_positions(positions, right):
+        quantity = abs(p.position)
+        num += quantity * p.contract.strike
+        den += quantity
     if den > 0:
         return num / den
 
@@ -80,18 +143,18 @@ def weighted_avg_short_strike(
 def weighted_avg_long_strike(
     positions: List[PortfolioItem], right: str
 ) -> Optional[float]:
-    shorts = [
-        (abs(p.position), p.contract.strike)
-        for p in get_long_positions(positions, right)
-    ]
-    num = sum([p[0] * p[1] for p in shorts])
-    den = sum([p[0] for p in shorts])
+    num = 0.0
+    den = 0.0
+    for p in get_long_positions(positions, right):
+        quantity = abs(p.position)
+        num += quantity * p.contract.strike
+        den += quantity
     if den > 0:
         return num / den
 
 
 def count_long_option_positions(positions: List[PortfolioItem], right: str) -> int:
-    return math.floor(sum([p.position for p in get_long_positions(positions, right)]))
+    return int(sum(p.position for p in get_long_positions(positions, right)))
 
 
 def calculate_net_short_positions(positions: List[PortfolioItem], right: str) -> int:
@@ -111,8 +174,10 @@ def calculate_net_short_positions(positions: List[PortfolioItem], right: str) ->
         )
         for p in get_long_positions(positions, right)
     ]
-    shorts = sorted(shorts, key=itemgetter(0, 1), reverse=right.upper().startswith("P"))
-    longs = sorted(longs, key=itemgetter(0, 1), reverse=right.upper().startswith("P"))
+    is_put = right.upper().startswith("P")
+    is_call = right.upper().startswith("C")
+    shorts = sorted(shorts, key=itemgetter(0, 1), reverse=is_put)
+    longs = sorted(longs, key=itemgetter(0, 1), reverse=is_put)
 
     def calc_net(short_dte: int, short_strike: float, short_position: float) -> float:
         for i in range(len(longs)):
@@ -125,8 +190,8 @@ def calculate_net_short_positions(positions: List[PortfolioItem], right: str) ->
             if long_dte >= short_dte:
                 if (
                     math.isclose(short_strike, long_strike)
-                    or (right.upper().startswith("P") and long_strike >= short_strike)
-                    or (right.upper().startswith("C") and long_strike <= short_strike)
+                    or (is_put and long_strike >= short_strike)
+                    or (is_call and long_strike <= short_strike)
                 ):
                     if short_position + long_position > 0:
                         long_position = short_position + long_position
@@ -135,7 +200,7 @@ def calculate_net_short_positions(positions: List[PortfolioItem], right: str) ->
                         short_position += long_position
                         long_position = 0
             longs[i] = (long_dte, long_strike, long_position)
-        return min([0.0, short_position])
+        return min(0.0, short_position)
 
     nets = [calc_net(*short) for short in shorts]
 
@@ -149,20 +214,17 @@ def net_option_positions(
     ignore_dte: Optional[int] = None,
 ) -> int:
     if symbol in portfolio_positions:
+        right = right.upper()
+        # Expired contracts are ignored, as are contracts at or below
+        # ignore_dte (when set)
+        min_dte = max(0, ignore_dte + 1) if ignore_dte else 0
         return math.floor(
             sum(
-                [
-                    p.position
-                    for p in portfolio_positions[symbol]
-                    if isinstance(p.contract, Option)
-                    and p.contract.right.upper().startswith(right.upper())
-                    and option_dte(p.contract.lastTradeDateOrContractMonth) >= 0
-                    and (
-                        not ignore_dte
-                        or option_dte(p.contract.lastTradeDateOrContractMonth)
-                        > ignore_dte
-                    )
-                ]
+                p.position
+                for p in portfolio_positions[symbol]
+                if isinstance(p.contract, Option)
+                and p.contract.right.upper().startswith(right)
+                and option_dte(p.contract.lastTradeDateOrContractMonth) >= min_dte
             )
         )
 
@@ -177,14 +239,14 @@ def get_higher_price(ticker: Ticker) -> float:
     # orders to fill in a given day, but I think that's a reasonable tradeoff to
     # avoid leaving money on the table.
     if ticker.modelGreeks and ticker.modelGreeks.optPrice:
-        return max([midpoint_or_market_price(ticker), ticker.modelGreeks.optPrice])
+        return max(midpoint_or_market_price(ticker), ticker.modelGreeks.optPrice)
     return midpoint_or_market_price(ticker)
 
 
 def get_lower_price(ticker: Ticker) -> float:
     # Same as get_highest_price(), except get the lower price instead.
     if ticker.modelGreeks and ticker.modelGreeks.optPrice:
-        return min([midpoint_or_market_price(ticker), ticker.modelGreeks.optPrice])
+        return min(midpoint_or_market_price(ticker), ticker.modelGreeks.optPrice)
     return midpoint_or_market_price(ticker)
 
 
@@ -210,14 +272,14 @@ def get_target_calls(
     config: Config, symbol: str, current_shares: int, target_shares: int
 ) -> int:
     if config.write_excess_calls_only(symbol):
-        return max([0, (current_shares - target_shares) // 100])
+        return max(0, (current_shares - target_shares) // 100)
     else:
         cap_factor = config.get_cap_factor(symbol)
         cap_target_floor = config.get_cap_target_floor(symbol)
         min_uncovered = (target_shares * cap_target_floor) // 100
         max_covered = (current_shares * cap_factor) // 100
         total_coverable = current_shares // 100
-        return max([0, math.floor(min([max_covered, total_coverable - min_uncovered]))])
+        return max(0, math.floor(min(max_covered, total_coverable - min_uncovered)))
 
 
 def would_increase_spread(order: Order, updated_price: float) -> bool: